@@ -1,5 +1,7 @@
 from typing import List, Dict, Any, Optional
 import asyncio
+import functools
+from concurrent.futures import ThreadPoolExecutor
 from langchain_huggingface import ChatHuggingFace, HuggingFaceEndpoint
 from langchain.agents import AgentExecutor, create_react_agent
 from langchain.tools import BaseTool
@@ -7,52 +9,40 @@ from langchain.prompts import PromptTemplate
 from memory.memory_manager import MemoryManager
 from cache.cache_manager import cache_manager
 from config.settings import settings
-from datetime import datetime
+from datetime import date
 import logging
 
 logger = logging.getLogger(__name__)
 
-class BaseAgent:
-    """Base agent with memory and caching"""
-    
-    def __init__(
-        self,
-        name: str,
-        role: str,
-        tools: List[BaseTool],
-        model_name: Optional[str] = None,
-        use_cache: bool = True
-    ):
-        self.name = name
-        self.role = role
-        self.tools = tools
-        self.use_cache = use_cache
-        
-        # Initialize LLM
-        llm_endpoint = HuggingFaceEndpoint(
-            repo_id=model_name or settings.PRIMARY_MODEL,
-            task="text-generation",
-            max_new_tokens=512,
-            do_sample=False,
-            temperature=0.0,
-            repetition_penalty=1.1,
-            stop_sequences=["\nObservation:", "Observation:"],
-            huggingfacehub_api_token=settings.HUGGINGFACEHUB_API_TOKEN
-        )
-        self.llm = ChatHuggingFace(llm=llm_endpoint)
-        
-        # Initialize memory
-        self.memory = MemoryManager()
-        
-        # Create agent
-        self.agent = self._create_agent()
-    
-    def _create_agent(self) -> AgentExecutor:
-        """Create LangChain agent"""
-        
-        # Define prompt template - Standard ReAct format
-        prompt = PromptTemplate.from_template(
-            """Answer the following questions as best you can. You are {name}, {role}
+# Shared thread pool for agent runs (bounded across all BaseAgent instances)
+_executor = ThreadPoolExecutor(max_workers=settings.AGENT_MAX_WORKERS)
+
+
+@functools.lru_cache(maxsize=1)
+def _format_date(day: date) -> str:
+    """Format the prompt date once per day, shared by all agents"""
+    return day.strftime("%Y-%m-%d")
+
+
+@functools.lru_cache(maxsize=8)
+def _get_llm(repo_id: str, max_new_tokens: int, temperature: float) -> ChatHuggingFace:
+    """Build one chat model per configuration, reused by every agent"""
+    llm_endpoint = HuggingFaceEndpoint(
+        repo_id=repo_id,
+        task="text-generation",
+        max_new_tokens=max_new_tokens,
+        do_sample=False,
+        temperature=temperature,
+        repetition_penalty=1.1,
+        stop_sequences=["\nObservation:", "Observation:"],
+        huggingfacehub_api_token=settings.HUGGINGFACEHUB_API_TOKEN
+    )
+    return ChatHuggingFace(llm=llm_endpoint)
+
+
+# Standard ReAct prompt, identical for every agent
+_REACT_PROMPT = PromptTemplate.from_template(
+    """Answer the following questions as best you can. You are {name}, {role}
 
 Current date: {current_date}
 
@@ -81,20 +71,52 @@ Begin!
 
 Question: {input}
 Thought:{agent_scratchpad}"""
-        )
+)
+
+
+class BaseAgent:
+    """Base agent with memory and caching"""
+    
+    def __init__(
+        self,
+        name: str,
+        role: str,
+        tools: List[BaseTool],
+        model_name: Optional[str] = None,
+        use_cache: bool = True,
+        use_fastpath: bool = True
+    ):
+        self.name = name
+        self.role = role
+        self.tools = tools
+        self.use_cache = use_cache
+        self.use_fastpath = use_fastpath
+        self._tool_names_str = ", ".join(tool.name for tool in tools)
+        
+        # Initialize LLM (shared with other agents using the same model)
+        self.llm = _get_llm(model_name or settings.PRIMARY_MODEL, 512, 0.0)
+        
+        # Initialize memory
+        self.memory = MemoryManager()
+        
+        # Create agent
+        self.agent = self._create_agent()
+    
+    def _create_agent(self) -> AgentExecutor:
+        """Create LangChain agent"""
         
         # Create ReAct agent
         agent = create_react_agent(
             llm=self.llm,
             tools=self.tools,
-            prompt=prompt
+            prompt=_REACT_PROMPT
         )
         
         # Create executor
         executor = AgentExecutor(
             agent=agent,
             tools=self.tools,
-            verbose=True,
+            verbose=settings.DEBUG,
             handle_parsing_errors=True,
             max_iterations=10,#avant était 5 
             # early_stopping_method="generate"  # Unsupported in current version
@@ -102,6 +124,14 @@ Thought:{agent_scratchpad}"""
         
         return executor
     
+    def _fast_path(self, query: str) -> Optional[str]:
+        """Answer a query with a direct tool call, or return None to run the agent.
+        
+        Runs in the agent thread pool; subclasses override it for query
+        shapes that map to exactly one tool.
+        """
+        return None
+    
     async def query(self, query: str) -> str:
         """Execute agent query with caching"""
         
@@ -116,21 +146,29 @@ Thought:{agent_scratchpad}"""
                 return cached_response
         
         try:
-            # Get conversation context
-            context = self.memory.get_context(query)
+            loop = asyncio.get_running_loop()
             
-            # Prepare input
-            input_data = {
-                "name": self.name,
-                "role": self.role,
-                "current_date": datetime.now().strftime("%Y-%m-%d"),
-                "input": query,
-                "tool_names": ", ".join([tool.name for tool in self.tools])
-            }
+            # Answer simple queries with a direct tool call (no LLM round trip)
+            response = None
+            if self.use_fastpath:
+                response = await loop.run_in_executor(_executor, self._fast_path, query)
             
-            # Execute agent (using sync invoke to avoid AsyncInferenceClient issues)
-            result = await asyncio.to_thread(self.agent.invoke, input_data)
-            response = result["output"]
+            if response is None:
+                # Get conversation context
+                context = self.memory.get_context(query)
+                
+                # Prepare input
+                input_data = {
+                    "name": self.name,
+                    "role": self.role,
+                    "current_date": _format_date(date.today()),
+                    "input": query,
+                    "tool_names": self._tool_names_str
+                }
+                
+                # Execute agent (using sync invoke to avoid AsyncInferenceClient issues)
+                result = await loop.run_in_executor(_executor, self.agent.invoke, input_data)
+                response = result["output"]
             
             # Cache response
             if self.use_cache:
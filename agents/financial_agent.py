@@ -1,8 +1,92 @@
 from langchain.tools import BaseTool, tool
 from agents.base_agent import BaseAgent
-from tools.financial_tools import FinancialTools
+from agents.simple_financial_agent import TICKER_PATTERNS
+from tools.financial_tools import FinancialTools, StockData, AnalystRecommendations, Fundamentals
 from config.settings import settings
-import json
+from typing import Any, Optional
+import re
+
+
+# "<ticker> price" style queries that only need get_stock_data_tool
+_FAST_PATH_RE = re.compile(
+    r"^\s*(?P<dollar>\$)?(?P<ticker>[A-Za-z]{1,5}(?:[.-][A-Za-z]{1,2})?)\s+(?:stock\s+)?(?:price|stock|quote)\s*\??\s*$",
+    re.IGNORECASE
+)
+
+
+def _fast_path_ticker(query: str) -> Optional[str]:
+    """Ticker of a "<ticker> price" query, or None when the word may not be a symbol.
+    
+    Known company keywords map to their ticker; any other word only counts
+    when typed as a symbol ("$gold", "GOLD"), so "gold price" or "what price"
+    go to the agent instead of quoting GOLD or WHAT.
+    """
+    match = _FAST_PATH_RE.match(query)
+    if not match:
+        return None
+    
+    token = match.group("ticker")
+    known = TICKER_PATTERNS.get(token.lower())
+    if known:
+        return known
+    if match.group("dollar") or token.isupper():
+        return token.upper()
+    return None
+
+
+def _na(value: Any) -> Any:
+    """Show N/A for missing values"""
+    return "N/A" if value is None else value
+
+
+def _grouped(value: Any) -> Any:
+    """Large integers with thousands separators"""
+    return f"{value:,}" if isinstance(value, (int, float)) else _na(value)
+
+
+def _format_stock_data(d: StockData) -> str:
+    """Render StockData as Markdown"""
+    return (
+        f"## Stock Data for {d.ticker.upper()}:\n"
+        f"- **Current Price**: ${_na(d.current_price)} {d.currency}\n"
+        f"- **Open**: ${_na(d.open)}\n"
+        f"- **High**: ${_na(d.high)}\n"
+        f"- **Low**: ${_na(d.low)}\n"
+        f"- **Close**: ${_na(d.close)}\n"
+        f"- **Volume**: {_grouped(d.volume)}\n"
+        f"- **Market Cap**: ${_grouped(d.market_cap)}\n"
+        f"- **P/E Ratio**: {_na(d.pe_ratio)}\n"
+    )
+
+
+def _format_recommendations(d: AnalystRecommendations) -> str:
+    """Render AnalystRecommendations as Markdown"""
+    return (
+        f"## Analyst Recommendations for {d.ticker.upper()}:\n"
+        f"- **Recommendation**: {_na(d.recommendation)}\n"
+        f"- **Mean Recommendation**: {_na(d.mean_recommendation)}\n"
+        f"- **Number of Analysts**: {_na(d.num_analysts)}\n"
+        f"- **Target Mean Price**: ${_na(d.target_mean)}\n"
+        f"- **Target High Price**: ${_na(d.target_high)}\n"
+        f"- **Target Low Price**: ${_na(d.target_low)}\n"
+    )
+
+
+def _format_fundamentals(d: Fundamentals) -> str:
+    """Render Fundamentals as Markdown"""
+    return (
+        f"## Fundamentals for {d.ticker.upper()}:\n"
+        f"- **Market Cap**: ${_grouped(d.market_cap)}\n"
+        f"- **P/E Ratio**: {_na(d.pe_ratio)}\n"
+        f"- **Forward P/E**: {_na(d.forward_pe)}\n"
+        f"- **PEG Ratio**: {_na(d.peg_ratio)}\n"
+        f"- **Price to Book**: {_na(d.price_to_book)}\n"
+        f"- **Debt to Equity**: {_na(d.debt_to_equity)}\n"
+        f"- **Return on Equity**: {_na(d.return_on_equity)}\n"
+        f"- **Profit Margins**: {_na(d.profit_margins)}\n"
+        f"- **Revenue Growth**: {_na(d.revenue_growth)}\n"
+    )
+
 
 # Create tool functions with proper decorators
 @tool
@@ -13,16 +97,7 @@ def get_stock_data_tool(ticker: str) -> str:
         if "error" in data:
             return f"Error getting stock data for {ticker}: {data['error']}"
         
-        formatted = f"## Stock Data for {ticker.upper()}:\n"
-        formatted += f"- **Current Price**: ${data.get('current_price', 'N/A')} {data.get('currency', '')}\n"
-        formatted += f"- **Open**: ${data.get('open', 'N/A')}\n"
-        formatted += f"- **High**: ${data.get('high', 'N/A')}\n"
-        formatted += f"- **Low**: ${data.get('low', 'N/A')}\n"
-        formatted += f"- **Close**: ${data.get('close', 'N/A')}\n"
-        formatted += f"- **Volume**: {data.get('volume', 'N/A'):,}\n"
-        formatted += f"- **Market Cap**: ${data.get('market_cap', 'N/A'):,}\n"
-        formatted += f"- **P/E Ratio**: {data.get('pe_ratio', 'N/A')}\n"
-        return formatted
+        return _format_stock_data(StockData.from_dict(data))
     except Exception as e:
         return f"Error getting stock data: {str(e)}"
 
@@ -34,14 +109,7 @@ def get_analyst_recommendations_tool(ticker: str) -> str:
         if "error" in data:
             return f"Error getting analyst recommendations for {ticker}: {data['error']}"
         
-        formatted = f"## Analyst Recommendations for {ticker.upper()}:\n"
-        formatted += f"- **Recommendation**: {data.get('recommendation', 'N/A')}\n"
-        formatted += f"- **Mean Recommendation**: {data.get('mean_recommendation', 'N/A')}\n"
-        formatted += f"- **Number of Analysts**: {data.get('num_analysts', 'N/A')}\n"
-        formatted += f"- **Target Mean Price**: ${data.get('target_mean', 'N/A')}\n"
-        formatted += f"- **Target High Price**: ${data.get('target_high', 'N/A')}\n"
-        formatted += f"- **Target Low Price**: ${data.get('target_low', 'N/A')}\n"
-        return formatted
+        return _format_recommendations(AnalystRecommendations.from_dict(data))
     except Exception as e:
         return f"Error getting analyst recommendations: {str(e)}"
 
@@ -53,13 +121,13 @@ def get_company_news_tool(ticker: str) -> str:
         if not news_items or (len(news_items) == 1 and "error" in news_items[0]):
             return f"No recent news found for {ticker}."
         
-        formatted = f"## Recent News for {ticker.upper()}:\n"
+        lines = [f"## Recent News for {ticker.upper()}:"]
         for i, item in enumerate(news_items[:3], 1):
-            formatted += f"\n{i}. **{item.get('title', 'No title')}**\n"
-            formatted += f"   Publisher: {item.get('publisher', 'Unknown')}\n"
+            lines.append(f"\n{i}. **{item.get('title', 'No title')}**")
+            lines.append(f"   Publisher: {item.get('publisher', 'Unknown')}")
             if item.get('published'):
-                formatted += f"   Published: {item.get('published')}\n"
-        return formatted
+                lines.append(f"   Published: {item.get('published')}")
+        return "\n".join(lines) + "\n"
     except Exception as e:
         return f"Error getting company news: {str(e)}"
 
@@ -71,17 +139,7 @@ def get_fundamentals_tool(ticker: str) -> str:
         if "error" in data:
             return f"Error getting fundamentals for {ticker}: {data['error']}"
         
-        formatted = f"## Fundamentals for {ticker.upper()}:\n"
-        formatted += f"- **Market Cap**: ${data.get('market_cap', 'N/A'):,}\n"
-        formatted += f"- **P/E Ratio**: {data.get('pe_ratio', 'N/A')}\n"
-        formatted += f"- **Forward P/E**: {data.get('forward_pe', 'N/A')}\n"
-        formatted += f"- **PEG Ratio**: {data.get('peg_ratio', 'N/A')}\n"
-        formatted += f"- **Price to Book**: {data.get('price_to_book', 'N/A')}\n"
-        formatted += f"- **Debt to Equity**: {data.get('debt_to_equity', 'N/A')}\n"
-        formatted += f"- **Return on Equity**: {data.get('return_on_equity', 'N/A')}\n"
-        formatted += f"- **Profit Margins**: {data.get('profit_margins', 'N/A')}\n"
-        formatted += f"- **Revenue Growth**: {data.get('revenue_growth', 'N/A')}\n"
-        return formatted
+        return _format_fundamentals(Fundamentals.from_dict(data))
     except Exception as e:
         return f"Error getting fundamentals: {str(e)}"
 
@@ -109,4 +167,14 @@ class FinancialAgent(BaseAgent):
             role=role,
             tools=tools,
             model_name=settings.PRIMARY_MODEL
-        )
\ No newline at end of file
+        )
+    
+    def _fast_path(self, query: str) -> Optional[str]:
+        """Call get_stock_data_tool directly for "<ticker> price" queries"""
+        ticker = _fast_path_ticker(query)
+        if not ticker:
+            return None
+        
+        response = get_stock_data_tool.invoke({"ticker": ticker})
+        # Not a valid ticker after all - let the agent handle it
+        return None if response.startswith("Error") else response
@@ -9,10 +9,12 @@ Architecture:
     
 Key Features:
     - Tool-First: APIs called BEFORE LLM (prevents hallucinations)
-    - Dual-source: yfinance (financial) + DuckDuckGo (news)
+    - Dual-source: yfinance (financial) + DuckDuckGo (news), fetched concurrently
     - Smart routing: Detects financial vs general queries
     - ThreadPoolExecutor: Fixes StopIteration issues
     - Clean fallback: Returns raw data if synthesis fails
+    - Semantic cache: Paraphrased queries reuse earlier answers
+    - Streaming: query_stream() yields synthesis tokens as they arrive
 
 Example:
     >>> orchestrator = MultiAgentOrchestrator()
@@ -24,13 +26,16 @@ Fixed Issues:
     - Hallucinations → Tool-First architecture
     - Empty news → Filtered in SimpleFinancialAgent
 """
-from typing import Dict, Any
+from typing import AsyncIterator, Dict, Any, Iterable, Tuple
 import asyncio
+import functools
+import re
 from concurrent.futures import ThreadPoolExecutor
 from langchain_huggingface import ChatHuggingFace, HuggingFaceEndpoint
 from agents.simple_financial_agent import SimpleFinancialAgent
 from tools.web_search_tools import web_search_tools
 from cache.cache_manager import cache_manager
+from cache.semantic_cache import semantic_cache, semantic_scope
 from config.settings import settings
 import logging
 
@@ -39,6 +44,173 @@ logger = logging.getLogger(__name__)
 # Thread pool for LLM calls to avoid StopIteration issues
 _executor = ThreadPoolExecutor(max_workers=2)
 
+# Routing keywords (matched case-insensitively)
+FINANCIAL_KEYWORDS = [
+    "stock", "price", "share", "market", "ticker", "symbol",
+    "earnings", "revenue", "profit", "dividend", "pe ratio",
+    "analyst", "recommendation", "target", "fundamental",
+    "action", "bourse", "cours", "résultats", "analyse"
+]
+
+COMPANY_KEYWORDS = [
+    "nvidia", "nvda", "tesla", "tsla", "apple", "aapl",
+    "microsoft", "msft", "amazon", "amzn", "google", "googl",
+    "meta", "facebook", "netflix", "nflx", "amd", "intel", "intc"
+]
+
+NEWS_KEYWORDS = [
+    "news", "latest", "recent", "today", "breaking", "update",
+    "actualité", "dernières", "récentes", "contexte", "marché"
+]
+
+# Words that make the synthesis answer in French
+FRENCH_KEYWORDS = ["analyse", "action", "bourse", "cours", "résultats", "marché", "donnez", "donne"]
+
+# Canonical search query per ticker (used by _simplify_query), and the words that select it
+_TICKER_OUT = {
+    "aapl": "AAPL Apple stock news 2024",
+    "nvda": "NVDA NVIDIA stock news 2024",
+    "tsla": "TSLA Tesla stock news 2024",
+    "msft": "MSFT Microsoft stock news 2024",
+    "googl": "GOOGL Google stock news 2024",
+    "amzn": "AMZN Amazon stock news 2024",
+    "meta": "META stock news 2024",
+    "amd": "AMD stock news 2024",
+    "intc": "INTC Intel stock news 2024",
+}
+_TICKER_ALIASES = {
+    "aapl": ("aapl", "apple"),
+    "nvda": ("nvda", "nvidia"),
+    "tsla": ("tsla", "tesla"),
+    "msft": ("msft",),
+    "googl": ("googl", "google"),
+    "amzn": ("amzn",),
+    "meta": ("meta",),
+    "amd": ("amd",),
+    "intc": ("intel",),
+}
+
+
+def _alternation(keywords: Iterable[str]) -> str:
+    """Escaped regex alternation of keywords, longest first"""
+    return "|".join(map(re.escape, sorted(keywords, key=len, reverse=True)))
+
+
+def _keyword_pattern(keywords: Iterable[str], whole_word: bool = False) -> re.Pattern:
+    """Compile keywords into one case-insensitive alternation.
+
+    Keywords only need to start on a word boundary so that plurals
+    ("stocks", "analysts") still match; company names and tickers must
+    match as whole words to avoid hits like "intel" in "intelligence".
+    """
+    suffix = r"\b" if whole_word else ""
+    return re.compile(rf"\b(?:{_alternation(keywords)}){suffix}", re.IGNORECASE)
+
+
+# All routing keywords in one pattern: match.lastgroup is the category
+ROUTE_RE = re.compile(
+    rf"\b(?:(?P<financial>{_alternation(FINANCIAL_KEYWORDS)})"
+    rf"|(?P<company>{_alternation(COMPANY_KEYWORDS)})\b"
+    rf"|(?P<news>{_alternation(NEWS_KEYWORDS)}))",
+    re.IGNORECASE
+)
+FRENCH_RE = _keyword_pattern(FRENCH_KEYWORDS)
+
+# One named group per ticker: match.lastgroup is the _TICKER_OUT key
+_TICKER_RE = re.compile(
+    r"\b(?:" + "|".join(
+        f"(?P<{ticker}>{'|'.join(map(re.escape, aliases))})"
+        for ticker, aliases in _TICKER_ALIASES.items()
+    ) + r")\b",
+    re.IGNORECASE
+)
+
+
+# Static segments of the synthesis prompt; the source data goes between them
+_SYNTHESIS_TEMPLATE = (
+    """[INST] You are a financial data formatter. Your ONLY job is to reorganize the data below.
+
+## ABSOLUTE RULES - VIOLATION = FAILURE
+
+1. **COPY-PASTE ONLY**: Every number in your response MUST appear exactly in the SOURCE DATA below
+2. **NO INVENTION**: Do NOT create any numbers, percentages, prices, or dates
+3. **NO EXTERNAL KNOWLEDGE**: Ignore everything you know about stocks. Use ONLY the data below.
+4. **CITE SOURCES**: Every data point must mention its source (yfinance or DuckDuckGo)
+
+## FORBIDDEN (examples of what NOT to do):
+❌ "The stock is expected to reach $500" (if 500 is not in the data)
+❌ "Revenue grew 45% in Q3" (if 45% and Q3 are not in the data)
+❌ "According to Bloomberg..." (if Bloomberg is not mentioned in sources)
+❌ Adding any analysis, predictions, or opinions
+
+## REQUIRED OUTPUT FORMAT:
+
+### Résumé (if {lang}=French) / Summary (if {lang}=English)
+- List 3-5 key facts using ONLY numbers from the data
+
+### Données Financières / Financial Data
+- Copy the key metrics from yfinance data below
+
+### Actualités / News
+- Summarize headlines from web search below (cite source)
+
+### Sources
+- yfinance API (real-time data)
+- DuckDuckGo Search
+
+---
+
+## SOURCE DATA (use ONLY this):
+
+### From yfinance API:
+""",
+    """
+
+### From DuckDuckGo Search:
+""",
+    """
+
+---
+
+Now write the formatted response in {lang}. Remember: COPY numbers, don't invent them. [/INST]""",
+)
+
+# Prompt segments pre-rendered for both answer languages
+_SYNTHESIS_PROMPTS = {
+    lang: tuple(segment.replace("{lang}", lang) for segment in _SYNTHESIS_TEMPLATE)
+    for lang in ("English", "French")
+}
+
+
+@functools.lru_cache(maxsize=2048)
+def _route_query(query: str) -> Tuple[bool, bool]:
+    """Return (needs_financial, needs_news) for a query"""
+    # Single scan, stopping once every category has been seen
+    found = set()
+    for match in ROUTE_RE.finditer(query):
+        found.add(match.lastgroup)
+        if len(found) == 3:
+            break
+    
+    return "financial" in found or "company" in found, "news" in found
+
+
+@functools.lru_cache(maxsize=2048)
+def _search_term(query: str) -> str:
+    """Canonical web search query for a known company, else the query itself"""
+    match = _TICKER_RE.search(query)
+    return _TICKER_OUT[match.lastgroup] if match else query
+
+
+def _normalize_query(query: str) -> str:
+    """Case- and whitespace-insensitive form of a query, used for cache keys"""
+    return " ".join(query.lower().split())
+
+
+async def _empty() -> str:
+    """Placeholder for a data source the query does not need"""
+    return ""
+
 
 class MultiAgentOrchestrator:
     """
@@ -83,6 +255,9 @@ class MultiAgentOrchestrator:
         """
         self.financial_agent = SimpleFinancialAgent()
         
+        # Pending answers by cache key, so duplicate concurrent queries share one run
+        self._inflight: Dict[str, asyncio.Future] = {}
+        
         # Use a better model for synthesis - Mixtral is more instruction-following
         synthesis_endpoint = HuggingFaceEndpoint(
             repo_id="mistralai/Mixtral-8x7B-Instruct-v0.1",  # Better at following instructions
@@ -91,6 +266,7 @@ class MultiAgentOrchestrator:
             do_sample=False,  # Deterministic - no creativity
             temperature=0.0,
             repetition_penalty=1.1,
+            streaming=True,
             huggingfacehub_api_token=settings.HUGGINGFACEHUB_API_TOKEN
         )
         self.synthesis_llm = ChatHuggingFace(llm=synthesis_endpoint)
@@ -107,50 +283,32 @@ class MultiAgentOrchestrator:
             Dict with keys:
                 - needs_financial (bool): True if financial data needed
                 - needs_news (bool): True if web search needed
+                - needs_synthesis (bool): True if both sources must be cross-referenced
         
         Examples:
             >>> orchestrator._analyze_query("NVIDIA stock price")
-            {'needs_financial': True, 'needs_news': False}
+            {'needs_financial': True, 'needs_news': False, 'needs_synthesis': False}
             
             >>> orchestrator._analyze_query("Latest Tesla news")
-            {'needs_financial': True, 'needs_news': True}
+            {'needs_financial': True, 'needs_news': True, 'needs_synthesis': True}
         """
-        query_lower = query.lower()
-        
-        financial_keywords = [
-            "stock", "price", "share", "market", "ticker", "symbol",
-            "earnings", "revenue", "profit", "dividend", "pe ratio",
-            "analyst", "recommendation", "target", "fundamental",
-            "action", "bourse", "cours", "résultats", "analyse"
-        ]
-        
-        company_keywords = [
-            "nvidia", "nvda", "tesla", "tsla", "apple", "aapl",
-            "microsoft", "msft", "amazon", "amzn", "google", "googl",
-            "meta", "facebook", "netflix", "nflx", "amd", "intel", "intc"
-        ]
-        
-        news_keywords = [
-            "news", "latest", "recent", "today", "breaking", "update",
-            "actualité", "dernières", "récentes", "contexte", "marché"
-        ]
-        
-        has_financial = any(k in query_lower for k in financial_keywords)
-        has_company = any(k in query_lower for k in company_keywords)
-        has_news = any(k in query_lower for k in news_keywords)
+        needs_financial, needs_news = _route_query(query)
         
         return {
-            "needs_financial": has_financial or has_company,
-            "needs_news": has_news,
+            "needs_financial": needs_financial,
+            "needs_news": needs_news,
+            "needs_synthesis": needs_financial and needs_news,
         }
     
     async def query(self, query: str) -> str:
         """Process user query using Tool-First + optional synthesis.
         
         Workflow:
+            0. Return a cached answer for the same (or a paraphrased) query,
+               or wait for an identical query that is already in flight
             1. Analyze query to determine data sources
             2. Fetch REAL data from APIs (yfinance, DuckDuckGo)
-            3. Optionally synthesize with LLM (if both sources)
+            3. Synthesize with LLM only when both sources must be cross-referenced
             4. Cache and return result
         
         Args:
@@ -158,8 +316,8 @@ class MultiAgentOrchestrator:
         
         Returns:
             Formatted response with real data. Either:
-            - Raw financial data (if only yfinance)
-            - Raw web search (if only DuckDuckGo)
+            - Raw financial data (if only yfinance, no LLM call)
+            - Raw web search (if only DuckDuckGo, no LLM call)
             - Synthesized response (if both sources + LLM succeeds)
             - Clean fallback (if synthesis fails)
         
@@ -173,47 +331,119 @@ class MultiAgentOrchestrator:
             >>> result = await orchestrator.query("Latest Apple news")
             >>> # Returns DuckDuckGo search results
         """
+        return "".join([chunk async for chunk in self.query_stream(query)])
+    
+    async def query_stream(self, query: str) -> AsyncIterator[str]:
+        """Process user query like query(), yielding the answer as it is produced.
+        
+        Cached and raw-data answers are yielded as a single chunk; LLM
+        synthesis is yielded token by token so UIs can render it immediately.
+        
+        Args:
+            query: User's natural language question
+        
+        Yields:
+            Successive chunks of the response (joined, they equal query())
+        
+        Example:
+            >>> async for chunk in orchestrator.query_stream("Apple stock and news"):
+            ...     print(chunk, end="", flush=True)
+        """
         
         # Check cache
-        cache_key = cache_manager._generate_key("orchestrator", query)
+        cache_key = cache_manager._generate_key("orchestrator", _normalize_query(query))
         cached = cache_manager.get(cache_key)
         if cached:
             logger.info("Using cached response")
-            return cached
+            yield cached
+            return
+        
+        # Join an identical query that is already being answered
+        inflight = self._inflight.get(cache_key)
+        if inflight is not None:
+            response = await asyncio.shield(inflight)
+            if response is not None:
+                logger.info("Joined in-flight request")
+                yield response
+                return
+        
+        future = asyncio.get_running_loop().create_future()
+        self._inflight[cache_key] = future
+        chunks = []
+        response = None
+        try:
+            async for chunk in self._run_pipeline(query, cache_key):
+                chunks.append(chunk)
+                yield chunk
+            response = "".join(chunks)
+        finally:
+            if self._inflight.get(cache_key) is future:
+                del self._inflight[cache_key]
+            # None (consumer stopped early) makes waiters run the pipeline themselves
+            future.set_result(response)
+    
+    async def _run_pipeline(self, query: str, cache_key: str) -> AsyncIterator[str]:
+        """Answer a query that missed the exact cache, yielding response chunks"""
         
         analysis = self._analyze_query(query)
         
+        # Check semantic cache (paraphrases of an already answered query):
+        # only among queries for the same ticker, route and details. Off by
+        # default, and then skipped without a thread hop
+        embedding = scope = None
+        if semantic_cache.enabled:
+            scope = semantic_scope(
+                query,
+                self.financial_agent._extract_ticker(query),
+                analysis["needs_financial"],
+                analysis["needs_news"],
+                analysis["needs_synthesis"]
+            )
+            embedding = await asyncio.to_thread(semantic_cache.embed, query)
+            cached = semantic_cache.get(embedding, scope)
+            if cached:
+                logger.info("Using semantically cached response")
+                yield cached
+                return
+        
+        chunks = []
         try:
-            financial_data = ""
-            web_data = ""
+            # STEP 1: Fetch REAL data (both sources concurrently)
+            needs_financial = analysis["needs_financial"]
+            needs_web = analysis["needs_news"] or not needs_financial
             
-            # STEP 1: Fetch REAL data
-            if analysis["needs_financial"]:
+            if needs_financial:
                 logger.info("📊 Fetching REAL financial data...")
-                financial_data = await self.financial_agent.query(query)
-            
-            if analysis["needs_news"] or not analysis["needs_financial"]:
+            if needs_web:
                 logger.info("🔍 Fetching REAL web search data...")
-                web_data = self._fetch_web_data(query)
             
-            # STEP 2: Synthesis with strict prompt
-            if financial_data and web_data:
-                response = await self._strict_synthesis(query, financial_data, web_data)
-            elif financial_data:
-                # Just reformat the financial data
-                response = await self._reformat_data(query, financial_data, "financial")
-            elif web_data:
-                response = await self._reformat_data(query, web_data, "web")
+            financial_data, web_data = await asyncio.gather(
+                self.financial_agent.query(query) if needs_financial else _empty(),
+                asyncio.to_thread(self._fetch_web_data, query) if needs_web else _empty(),
+            )
+            
+            # STEP 2: Synthesis with strict prompt (only when cross-referencing)
+            if financial_data and web_data and analysis["needs_synthesis"]:
+                async for chunk in self._strict_synthesis(query, financial_data, web_data):
+                    chunks.append(chunk)
+                    yield chunk
+                response = "".join(chunks)
+            elif financial_data or web_data:
+                # Tool output is already Markdown - no extra LLM round trip
+                response = self._format_fallback(financial_data, web_data)
+                yield response
             else:
                 response = "Could not find relevant information."
+                yield response
             
             # Cache response
             cache_manager.set(cache_key, response, ttl=settings.CACHE_TTL)
-            return response
+            semantic_cache.add(cache_key, embedding, scope)
             
         except Exception as e:
             logger.error(f"Orchestrator error: {e}")
-            return f"Error: {str(e)}"
+            # Nothing is cached; after a partial answer the error goes on its own line
+            yield f"\n\nError: {str(e)}" if chunks else f"Error: {str(e)}"
     
     def _fetch_web_data(self, query: str) -> str:
         """Fetch web search data"""
@@ -237,138 +467,82 @@ class MultiAgentOrchestrator:
     
     def _simplify_query(self, query: str) -> str:
         """Simplify query for better search"""
-        query_lower = query.lower()
-        
-        companies = {
-            "aapl": "AAPL Apple stock news 2024",
-            "apple": "AAPL Apple stock news 2024",
-            "nvda": "NVDA NVIDIA stock news 2024",
-            "nvidia": "NVDA NVIDIA stock news 2024",
-            "tsla": "TSLA Tesla stock news 2024",
-            "tesla": "TSLA Tesla stock news 2024",
-            "msft": "MSFT Microsoft stock news 2024",
-            "googl": "GOOGL Google stock news 2024",
-            "amzn": "AMZN Amazon stock news 2024",
-            "meta": "META stock news 2024",
-            "amd": "AMD stock news 2024",
-            "intel": "INTC Intel stock news 2024",
-        }
-        
-        for keyword, search_term in companies.items():
-            if keyword in query_lower:
-                return search_term
-        
-        return query
+        return _search_term(query)
     
-    async def _strict_synthesis(self, query: str, financial_data: str, web_data: str) -> str:
+    async def _strict_synthesis(self, query: str, financial_data: str, web_data: str) -> AsyncIterator[str]:
         """
         Ultra-strict synthesis prompt with explicit rules and examples.
+        Yields the LLM answer token by token.
         """
         
         # Detect language
-        is_french = any(w in query.lower() for w in ["analyse", "action", "bourse", "cours", "résultats", "marché", "donnez", "donne"])
-        lang = "French" if is_french else "English"
+        is_french = bool(FRENCH_RE.search(query))
         
-        prompt = f"""[INST] You are a financial data formatter. Your ONLY job is to reorganize the data below.
-
-## ABSOLUTE RULES - VIOLATION = FAILURE
-
-1. **COPY-PASTE ONLY**: Every number in your response MUST appear exactly in the SOURCE DATA below
-2. **NO INVENTION**: Do NOT create any numbers, percentages, prices, or dates
-3. **NO EXTERNAL KNOWLEDGE**: Ignore everything you know about stocks. Use ONLY the data below.
-4. **CITE SOURCES**: Every data point must mention its source (yfinance or DuckDuckGo)
-
-## FORBIDDEN (examples of what NOT to do):
-❌ "The stock is expected to reach $500" (if 500 is not in the data)
-❌ "Revenue grew 45% in Q3" (if 45% and Q3 are not in the data)
-❌ "According to Bloomberg..." (if Bloomberg is not mentioned in sources)
-❌ Adding any analysis, predictions, or opinions
-
-## REQUIRED OUTPUT FORMAT:
-
-### Résumé (if {lang}=French) / Summary (if {lang}=English)
-- List 3-5 key facts using ONLY numbers from the data
-
-### Données Financières / Financial Data
-- Copy the key metrics from yfinance data below
-
-### Actualités / News
-- Summarize headlines from web search below (cite source)
-
-### Sources
-- yfinance API (real-time data)
-- DuckDuckGo Search
-
----
-
-## SOURCE DATA (use ONLY this):
-
-### From yfinance API:
-{financial_data}
-
-### From DuckDuckGo Search:
-{web_data}
-
----
-
-Now write the formatted response in {lang}. Remember: COPY numbers, don't invent them. [/INST]"""
+        head, mid, tail = _SYNTHESIS_PROMPTS["French" if is_french else "English"]
+        prompt = "".join((head, financial_data, mid, web_data, tail))
 
+        produced = False
         try:
-            # Use executor to avoid StopIteration issues with asyncio.to_thread
-            loop = asyncio.get_event_loop()
-            response = await loop.run_in_executor(_executor, self.synthesis_llm.invoke, prompt)
-            return response.content
+            async for token in self._stream_llm(prompt):
+                produced = True
+                yield token
         except Exception as e:
             logger.error(f"Synthesis error: {e}")
-            # Fallback: return clean formatted raw data
-            return self._format_fallback(financial_data, web_data)
+            # Fallback: return clean formatted raw data. Mid-answer, re-raise
+            # so the cut-off answer isn't cached as a complete one
+            if produced:
+                raise
+            yield self._format_fallback(financial_data, web_data)
     
-    async def _reformat_data(self, query: str, data: str, data_type: str) -> str:
-        """Reformat a single data source"""
+    async def _stream_llm(self, prompt: str) -> AsyncIterator[str]:
+        """Stream synthesis tokens from the endpoint.
         
-        is_french = any(w in query.lower() for w in ["analyse", "action", "bourse", "cours", "donne"])
-        lang = "French" if is_french else "English"
+        The sync stream() runs in the executor (avoids StopIteration and
+        AsyncInferenceClient issues) and hands tokens back through a queue.
+        """
+        loop = asyncio.get_running_loop()
+        queue: asyncio.Queue = asyncio.Queue()
+        done = object()
         
-        source = "yfinance API" if data_type == "financial" else "DuckDuckGo"
+        def produce():
+            try:
+                # The prompt is already in [INST] format, so stream the raw
+                # endpoint (the chat wrapper only returns one final chunk)
+                for token in self.synthesis_llm.llm.stream(prompt):
+                    loop.call_soon_threadsafe(queue.put_nowait, token)
+            except Exception as e:
+                loop.call_soon_threadsafe(queue.put_nowait, e)
+            loop.call_soon_threadsafe(queue.put_nowait, done)
         
-        prompt = f"""[INST] Reformat this {data_type} data in {lang}. 
-
-RULES:
-- COPY all numbers exactly as they appear
-- Do NOT add any new data
-- Do NOT make predictions
-
-DATA:
-{data}
-
-Write a clean, formatted version in {lang}. End with: "Source: {source}" [/INST]"""
-
-        try:
-            loop = asyncio.get_event_loop()
-            response = await loop.run_in_executor(_executor, self.synthesis_llm.invoke, prompt)
-            return response.content
-        except Exception as e:
-            logger.error(f"Reformat error: {e}")
-            return data
+        future = loop.run_in_executor(_executor, produce)
+        while (item := await queue.get()) is not done:
+            if isinstance(item, Exception):
+                raise item
+            yield item
+        await future
     
     def _format_fallback(self, financial_data: str, web_data: str) -> str:
-        """Clean fallback format when synthesis fails"""
+        """Clean raw-data format (single source, or when synthesis fails)"""
         parts = []
+        sources = []
         
         if financial_data:
             parts.append("## 📊 Données Financières (yfinance API)")
             parts.append(financial_data)
+            sources.append("yfinance API (données en temps réel)")
         
         if web_data:
             parts.append("\n## 📰 Actualités (DuckDuckGo)")
             parts.append(web_data)
+            sources.append("DuckDuckGo (actualités)")
         
         parts.append("\n---")
-        parts.append("*Sources: yfinance API (données en temps réel), DuckDuckGo (actualités)*")
+        parts.append(f"*Sources: {', '.join(sources)}*")
         
         return "\n".join(parts)
     
     def clear_memory(self):
         """Clear cache"""
         cache_manager.clear()
+        semantic_cache.clear()
         logger.info("Cache cleared")
@@ -25,14 +25,33 @@ Constants:
     TICKER_PATTERNS: Dict mapping company names to ticker symbols
 """
 import asyncio
+import contextvars
+import functools
+import itertools
 import re
-from typing import Optional, Dict, Any, List
-from langchain_huggingface import ChatHuggingFace, HuggingFaceEndpoint
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, AsyncIterator, Optional, Dict, Any, Iterable, List
+import yfinance as yf
+from yfinance.exceptions import YFException
 from tools.financial_tools import FinancialTools
 from tools.web_search_tools import web_search_tools
+from cache.cache_manager import cache_manager
 from config.settings import settings
 import logging
 
+if TYPE_CHECKING:
+    from langchain_huggingface import ChatHuggingFace
+
+try:
+    import re2  # optional: linear-time regex matching
+except ImportError:
+    re2 = None
+
+try:
+    import ahocorasick
+except ImportError:  # optional: regex fallback below
+    ahocorasick = None
+
 logger = logging.getLogger(__name__)
 
 # Ticker patterns for extraction
@@ -49,6 +68,224 @@ TICKER_PATTERNS = {
     "intel": "INTC", "intc": "INTC",
 }
 
+# Compiled once: company keywords (longest first, whole words) and explicit
+# tickers. RE2 (when installed) guarantees linear-time matching on user text
+_re = re2 or re
+_KEYWORD_RE = _re.compile(
+    r'(?i)\b(' + '|'.join(re.escape(k) for k in sorted(TICKER_PATTERNS, key=len, reverse=True)) + r')\b'
+)
+_TICKER_RE = _re.compile(r'\b([A-Z]{2,5})\b')
+_VALID_TICKERS = frozenset(TICKER_PATTERNS.values())
+
+# News titles yfinance returns for redacted or missing items
+_BAD_TITLES = frozenset({"", "****", None})
+_NON_SPACE_RE = re.compile(r'\S')
+
+def _is_valid_title(title: Optional[str]) -> bool:
+    return title not in _BAD_TITLES and _NON_SPACE_RE.search(title) is not None
+
+# Failures a data fetch can raise (curl_cffi network errors are OSErrors);
+# anything else is a bug and should propagate
+_FETCH_ERRORS = (OSError, KeyError, ValueError, YFException)
+
+# Caps concurrent yfinance calls so bursts don't get rate-limited upstream.
+# asyncio semaphores belong to one event loop, so each loop gets its own
+_YF_SEMAPHORES: Dict[asyncio.AbstractEventLoop, asyncio.Semaphore] = {}
+
+def _yf_semaphore() -> asyncio.Semaphore:
+    """The yfinance concurrency limit of the running event loop"""
+    loop = asyncio.get_running_loop()
+    semaphore = _YF_SEMAPHORES.get(loop)
+    if semaphore is None:
+        for closed in [l for l in _YF_SEMAPHORES if l.is_closed()]:
+            del _YF_SEMAPHORES[closed]
+        semaphore = _YF_SEMAPHORES[loop] = asyncio.Semaphore(settings.YFINANCE_CONCURRENCY)
+    return semaphore
+
+async def _yf_call(func, *args, **kwargs):
+    """Run a blocking FinancialTools call in the default executor, within the yfinance limit.
+    
+    The permit is held until the worker thread returns, not until the caller
+    stops waiting: a caller that times out (wait_for) or is cancelled leaves
+    the thread running, and that thread still counts against the limit.
+    """
+    semaphore = _yf_semaphore()
+    await semaphore.acquire()
+    try:
+        loop = asyncio.get_running_loop()
+        call = functools.partial(contextvars.copy_context().run, func, *args, **kwargs)
+        future = loop.run_in_executor(None, call)
+    except BaseException:
+        semaphore.release()
+        raise
+    
+    def _done(f: asyncio.Future):
+        semaphore.release()
+        if not f.cancelled():
+            f.exception()  # Abandoned calls: don't log "exception never retrieved"
+    
+    future.add_done_callback(_done)
+    # Shielded so cancelling the caller doesn't mark the future done (and
+    # free the permit) while the thread is still running
+    return await asyncio.shield(future)
+
+
+def _build_automaton():
+    """Aho-Corasick automaton over TICKER_PATTERNS keys, if pyahocorasick is installed"""
+    if ahocorasick is None:
+        return None
+    automaton = ahocorasick.Automaton()
+    for keyword, ticker in TICKER_PATTERNS.items():
+        automaton.add_word(keyword, (keyword, ticker))
+    automaton.make_automaton()
+    return automaton
+
+
+_AUTOMATON = _build_automaton()
+
+
+def _is_word_char(text: str, index: int) -> bool:
+    return 0 <= index < len(text) and (text[index].isalnum() or text[index] == "_")
+
+
+def _match_keyword(query: str) -> Optional[str]:
+    """Leftmost-longest whole-word TICKER_PATTERNS key in the query, or None"""
+    if _AUTOMATON is None:
+        match = _KEYWORD_RE.search(query)
+        return match.group(1).lower() if match else None
+    
+    text = query.lower()
+    best = None  # (start, -length, keyword)
+    for end, (keyword, _) in _AUTOMATON.iter(text):
+        start = end - len(keyword) + 1
+        if _is_word_char(text, start - 1) or _is_word_char(text, end + 1):
+            continue
+        candidate = (start, -len(keyword), keyword)
+        if best is None or candidate < best:
+            best = candidate
+    return best[2] if best else None
+
+
+@functools.lru_cache(maxsize=1024)
+def _extract_ticker_cached(query: str) -> Optional[str]:
+    """Memoized ticker extraction (keyed on the raw query: explicit tickers are case-sensitive)"""
+    keyword = _match_keyword(query)
+    if keyword:
+        ticker = TICKER_PATTERNS[keyword]
+        logger.info(f"Extracted ticker: {ticker} from keyword: {keyword}")
+        return ticker
+    
+    # Try to find explicit ticker (e.g., "NVDA" in the query)
+    ticker_match = _TICKER_RE.search(query)
+    if ticker_match:
+        potential_ticker = ticker_match.group(1)
+        if potential_ticker in _VALID_TICKERS:
+            return potential_ticker
+    
+    return None
+
+
+# Response sections, filled from tool data via _with_defaults
+STOCK_FIELDS = ("current_price", "low", "high", "volume", "pe_ratio", "52_week_low", "52_week_high", "timestamp")
+STOCK_TEMPLATE = """## 📈 Stock Data for {ticker}
+- **Current Price**: ${current_price} {currency}
+- **Day Range**: ${low} - ${high}
+- **Volume**: {volume}{market_cap_line}
+- **P/E Ratio**: {pe_ratio}
+- **52-Week Range**: ${52_week_low} - ${52_week_high}
+- **Data Timestamp**: {timestamp}"""
+
+ANALYST_FIELDS = ("recommendation", "num_analysts")
+ANALYST_TEMPLATE = """## 📊 Analyst Recommendations
+- **Recommendation**: {recommendation}
+- **Number of Analysts**: {num_analysts}"""
+
+# Comparison table headers
+PRICES_TABLE = """## 💰 Current Prices
+| Ticker | Price | Day Change | Volume |
+|--------|-------|------------|--------|"""
+VALUATION_TABLE = """## 📈 Market Cap & Valuation
+| Ticker | Market Cap | P/E Ratio | 52-Week Range |
+|--------|------------|-----------|---------------|"""
+FUNDAMENTALS_TABLE = """## 💼 Fundamentals
+| Ticker | Profit Margin | Revenue Growth | ROE | Debt/Equity |
+|--------|---------------|----------------|-----|-------------|"""
+ANALYSTS_TABLE = """## 🎯 Analyst Recommendations
+| Ticker | Recommendation | Target Price | # Analysts |
+|--------|----------------|--------------|------------|"""
+
+
+def _money(x) -> str:
+    return f"${x:.2f}"
+
+def _pct(x) -> str:
+    return f"{x*100:.1f}%"
+
+def _market_cap(x) -> str:
+    return f"${x/1e12:.2f}T" if x > 1e12 else f"${x/1e9:.1f}B"
+
+def _cell(section: Dict[str, Any], key: str, fmt=str) -> str:
+    """Format one comparison cell: "Error" for a failed section, "N/A" for missing values"""
+    if "error" in section:
+        return "Error"
+    val = section.get(key)
+    if val is None or val == "N/A":
+        return "N/A"
+    try:
+        return fmt(val)
+    except (TypeError, ValueError):
+        return "N/A"
+
+@dataclass(slots=True)
+class TickerRow:
+    """Pre-formatted comparison table cells for one ticker"""
+    ticker: str
+    price: str
+    currency: str
+    day_range: str
+    volume: str
+    market_cap: str
+    pe: str
+    range_52: str
+    profit: str
+    revenue: str
+    roe: str
+    debt: str
+    rec: str
+    target: str
+    num: str
+    
+    @classmethod
+    def from_data(cls, ticker: str, ticker_data: Dict[str, Any]) -> "TickerRow":
+        """Flatten one ticker's stock/fundamentals/analysts sections"""
+        stock = ticker_data.get("stock", {})
+        fundamentals = ticker_data.get("fundamentals", {})
+        analysts = ticker_data.get("analysts", {})
+        
+        low, high = _cell(stock, "low", _money), _cell(stock, "high", _money)
+        low_52, high_52 = _cell(stock, "52_week_low", _money), _cell(stock, "52_week_high", _money)
+        return cls(
+            ticker=ticker,
+            price=_cell(stock, "current_price", _money),
+            currency=_cell(stock, "currency"),
+            day_range=f"{low} - {high}" if low != "N/A" and high != "N/A" else "N/A",
+            volume=_cell(stock, "volume", "{:,}".format),
+            market_cap=_cell(stock, "market_cap", _market_cap),
+            pe=_cell(stock, "pe_ratio", "{:.1f}".format),
+            range_52=f"{low_52} - {high_52}" if low_52 != "N/A" else "N/A",
+            profit=_cell(fundamentals, "profit_margins", _pct),
+            revenue=_cell(fundamentals, "revenue_growth", _pct),
+            roe=_cell(fundamentals, "return_on_equity", _pct),
+            debt=_cell(fundamentals, "debt_to_equity", "{:.2f}".format),
+            rec=_cell(analysts, "recommendation"),
+            target=_cell(analysts, "target_mean", _money),
+            num=_cell(analysts, "num_analysts"),
+        )
+
+def _with_defaults(data: Dict[str, Any], keys: Iterable[str]) -> Dict[str, Any]:
+    """Pick keys from a tool result, using N/A for missing or empty values"""
+    return {key: "N/A" if data.get(key) is None else data[key] for key in keys}
+
 
 class SimpleFinancialAgent:
     """
@@ -65,7 +302,8 @@ class SimpleFinancialAgent:
         - Filtered empty news
     
     Attributes:
-        llm: LangChain LLM wrapper (only for formatting, not used currently)
+        llm: LangChain LLM wrapper (only for formatting, not used currently;
+            created lazily)
     
     Example:
         >>> agent = SimpleFinancialAgent()
@@ -76,10 +314,19 @@ class SimpleFinancialAgent:
     def __init__(self):
         """Initialize the financial agent.
         
-        Creates an LLM wrapper (currently unused - reserved for future
-        formatting improvements).
+        The LLM wrapper (currently unused - reserved for future formatting
+        improvements) is only created on first access of `llm`.
         """
-        # LLM only for summarization (not for tool calling)
+        logger.info("✅ Initialized SimpleFinancialAgent (Tool-First)")
+    
+    @functools.cached_property
+    def llm(self) -> "ChatHuggingFace":
+        """LLM only for summarization (not for tool calling), built on first use"""
+        if not settings.ENABLE_LLM_FORMATTING:
+            raise RuntimeError("SimpleFinancialAgent.llm requires ENABLE_LLM_FORMATTING=true")
+        # Imported here: langchain_huggingface is heavy and unused on the data path
+        from langchain_huggingface import ChatHuggingFace, HuggingFaceEndpoint
+        
         llm_endpoint = HuggingFaceEndpoint(
             repo_id=settings.PRIMARY_MODEL,
             task="text-generation",
@@ -89,8 +336,7 @@ class SimpleFinancialAgent:
             repetition_penalty=1.1,
             huggingfacehub_api_token=settings.HUGGINGFACEHUB_API_TOKEN
         )
-        self.llm = ChatHuggingFace(llm=llm_endpoint)
-        logger.info("✅ Initialized SimpleFinancialAgent (Tool-First)")
+        return ChatHuggingFace(llm=llm_endpoint)
     
     def _extract_ticker(self, query: str) -> Optional[str]:
         """Extract ticker symbol from natural language query.
@@ -107,20 +353,7 @@ class SimpleFinancialAgent:
             >>> agent._extract_ticker("What about Tesla?")
             'TSLA'
         """
-        query_lower = query.lower()
-        for keyword, ticker in TICKER_PATTERNS.items():
-            if keyword in query_lower:
-                logger.info(f"Extracted ticker: {ticker} from keyword: {keyword}")
-                return ticker
-        
-        # Try to find explicit ticker (e.g., "NVDA" in the query)
-        ticker_match = re.search(r'\b([A-Z]{2,5})\b', query)
-        if ticker_match:
-            potential_ticker = ticker_match.group(1)
-            if potential_ticker in TICKER_PATTERNS.values():
-                return potential_ticker
-        
-        return None
+        return _extract_ticker_cached(query)
     
     async def query(self, query: str) -> str:
         """
@@ -161,114 +394,175 @@ class SimpleFinancialAgent:
         logger.info(f"Fetching REAL financial data for {ticker}")
         
         # STEP 1: Call tools DIRECTLY (no LLM involved)
-        real_data = await self._fetch_all_data(ticker)
+        real_data = await self.get_ticker_data(ticker)
         
         # STEP 2: Format response using real data
         formatted = self._format_response(ticker, real_data)
         
         return formatted
     
-    async def _fetch_all_data(self, ticker: str) -> Dict[str, Any]:
-        """Fetch all financial data directly from tools"""
-        data = {}
+    async def get_ticker_data(self, ticker: str) -> Dict[str, Any]:
+        """Get the stock/analysts/fundamentals/news bundle for a ticker, cached as a whole.
         
-        # Get stock data from yfinance
-        try:
-            data["stock"] = FinancialTools.get_stock_data(ticker)
-            logger.info(f"✅ Got stock data for {ticker}")
-        except Exception as e:
-            logger.error(f"Stock data error: {e}")
-            data["stock"] = {"error": str(e)}
+        Args:
+            ticker: Ticker symbol (e.g., "NVDA")
         
-        # Get analyst recommendations
-        try:
-            data["analysts"] = FinancialTools.get_analyst_recommendations(ticker)
-            logger.info(f"✅ Got analyst data for {ticker}")
-        except Exception as e:
-            logger.error(f"Analyst data error: {e}")
-            data["analysts"] = {"error": str(e)}
+        Returns:
+            Dict with "stock", "analysts", "fundamentals" and "news" sections
+        """
+        ticker = ticker.upper()
+        # Concurrent callers for one ticker share a single fetch. Bundles carry
+        # the price, so they expire with it; failed fetches aren't cached
+        return await cache_manager.get_or_compute(
+            cache_manager._generate_key("ticker_data", ticker),
+            lambda: self._fetch_ticker_data(ticker),
+            ttl=settings.STOCK_CACHE_TTL,
+            cacheable=lambda data: "error" not in data.get("stock", {})
+        )
+    
+    async def _fetch_ticker_data(self, ticker: str) -> Dict[str, Any]:
+        """Fetch all financial data directly from tools"""
+        # The four calls run concurrently on one shared Ticker: the quote
+        # summary (info) behind stock/analysts/fundamentals is downloaded once,
+        # in parallel with the price history and the news
+        stock = yf.Ticker(ticker)
+        stock_data, analysts, fundamentals, news = await asyncio.gather(
+            self._fetch(FinancialTools.get_stock_data, ticker, stock),
+            self._fetch(FinancialTools.get_analyst_recommendations, ticker, stock),
+            self._fetch(FinancialTools.get_fundamentals, ticker, stock),
+            self._fetch(FinancialTools.get_company_news, ticker, stock, default=[]),
+        )
+        logger.info(f"✅ Got financial data for {ticker}")
         
-        # Get fundamentals
-        try:
-            data["fundamentals"] = FinancialTools.get_fundamentals(ticker)
-            logger.info(f"✅ Got fundamentals for {ticker}")
-        except Exception as e:
-            logger.error(f"Fundamentals error: {e}")
-            data["fundamentals"] = {"error": str(e)}
+        return {"stock": stock_data, "analysts": analysts, "fundamentals": fundamentals, "news": news}
+    
+    async def _fetch(self, fetch, ticker: str, stock: yf.Ticker, default: Any = None) -> Any:
+        """Run one FinancialTools call within FETCH_TIMEOUT.
         
-        # Get news
+        Timeouts and fetch errors become an {"error": ...} dict, or default
+        when given (e.g. [] for news).
+        """
         try:
-            data["news"] = FinancialTools.get_company_news(ticker)
-            logger.info(f"✅ Got news for {ticker}")
-        except Exception as e:
-            logger.error(f"News error: {e}")
-            data["news"] = []
-        
-        return data
+            return await asyncio.wait_for(_yf_call(fetch, ticker, stock=stock), timeout=settings.FETCH_TIMEOUT)
+        except TimeoutError:
+            logger.error(f"[{fetch.__name__}] {ticker} timed out after {settings.FETCH_TIMEOUT}s")
+            return {"error": f"Timed out after {settings.FETCH_TIMEOUT}s"} if default is None else default
+        except _FETCH_ERRORS as e:
+            logger.error(f"[{fetch.__name__}] Fetch error for {ticker}: {e}")
+            return {"error": str(e)} if default is None else default
     
     def _format_response(self, ticker: str, data: Dict[str, Any]) -> str:
         """Format real data into a readable response"""
-        parts = []
-        
-        # Stock data
-        stock = data.get("stock", {})
-        if "error" not in stock:
-            parts.append(f"## 📈 Stock Data for {ticker}")
-            parts.append(f"- **Current Price**: ${stock.get('current_price', 'N/A')} {stock.get('currency', 'USD')}")
-            parts.append(f"- **Day Range**: ${stock.get('low', 'N/A')} - ${stock.get('high', 'N/A')}")
-            parts.append(f"- **Volume**: {stock.get('volume', 'N/A'):,}")
-            if stock.get('market_cap'):
-                parts.append(f"- **Market Cap**: ${stock.get('market_cap', 0):,.0f}")
-            parts.append(f"- **P/E Ratio**: {stock.get('pe_ratio', 'N/A')}")
-            parts.append(f"- **52-Week Range**: ${stock.get('52_week_low', 'N/A')} - ${stock.get('52_week_high', 'N/A')}")
-            parts.append(f"- **Data Timestamp**: {stock.get('timestamp', 'N/A')}")
-        else:
-            parts.append(f"⚠️ Could not fetch stock data: {stock.get('error')}")
+        sections = (
+            self._format_stock(ticker, data.get("stock", {})),
+            self._format_analysts(data.get("analysts", {})),
+            self._format_fundamentals(data.get("fundamentals", {})),
+            self._format_news(data.get("news", [])),
+        )
+        return "\n\n".join(section for section in sections if section)
+    
+    def _format_stock(self, ticker: str, stock: Dict[str, Any]) -> str:
+        """Stock data section (or a warning if it could not be fetched)"""
+        if "error" in stock:
+            return f"⚠️ Could not fetch stock data: {stock.get('error')}"
+        
+        values = _with_defaults(stock, STOCK_FIELDS)
+        values["currency"] = stock.get("currency") or "USD"
+        if isinstance(stock.get("volume"), (int, float)):
+            values["volume"] = f"{stock['volume']:,}"
+        market_cap = stock.get("market_cap")
+        values["market_cap_line"] = f"\n- **Market Cap**: ${market_cap:,.0f}" if market_cap else ""
+        return STOCK_TEMPLATE.format_map(values | {"ticker": ticker})
+    
+    def _format_analysts(self, analysts: Dict[str, Any]) -> str:
+        """Analyst recommendations section, empty on error"""
+        if "error" in analysts:
+            return ""
+        
+        parts = [ANALYST_TEMPLATE.format_map(_with_defaults(analysts, ANALYST_FIELDS))]
+        if analysts.get('target_mean'):
+            parts.append(f"- **Target Price (Mean)**: ${analysts.get('target_mean', 'N/A')}")
+        if analysts.get('target_high') and analysts.get('target_low'):
+            parts.append(f"- **Target Range**: ${analysts.get('target_low')} - ${analysts.get('target_high')}")
+        return "\n".join(parts)
+    
+    def _format_fundamentals(self, funds: Dict[str, Any]) -> str:
+        """Fundamentals section, empty on error"""
+        if "error" in funds:
+            return ""
+        
+        parts = ["## 💰 Fundamentals"]
+        if funds.get('profit_margins'):
+            parts.append(f"- **Profit Margin**: {funds.get('profit_margins', 0)*100:.1f}%")
+        if funds.get('revenue_growth'):
+            parts.append(f"- **Revenue Growth**: {funds.get('revenue_growth', 0)*100:.1f}%")
+        if funds.get('return_on_equity'):
+            parts.append(f"- **Return on Equity**: {funds.get('return_on_equity', 0)*100:.1f}%")
+        parts.append(f"- **Debt to Equity**: {funds.get('debt_to_equity', 'N/A')}")
+        return "\n".join(parts)
+    
+    def _format_news(self, news: List[Dict[str, Any]]) -> str:
+        """News section - filter out empty ones"""
+        # Stop filtering once the three displayed items are found
+        valid_news = list(itertools.islice(
+            (item for item in news if _is_valid_title(item.get('title'))),
+            3
+        ))
+        
+        if not valid_news:
+            return ""
+        
+        parts = ["## 📰 Recent News (yfinance)"]
+        for i, item in enumerate(valid_news, 1):
+            parts.append(f"{i}. **{item.get('title')}**")
+            if item.get('publisher'):
+                parts.append(f"   Publisher: {item.get('publisher')}")
+        return "\n".join(parts)
+    
+    async def stream_query(self, query: str) -> AsyncIterator[str]:
+        """
+        Process a financial query like query(), yielding each section as soon
+        as its data arrives.
         
-        parts.append("")
+        The four yfinance calls run concurrently; sections are emitted in
+        completion order, so the first bytes go out after the fastest call
+        instead of the slowest.
         
-        # Analyst recommendations
-        analysts = data.get("analysts", {})
-        if "error" not in analysts:
-            parts.append("## 📊 Analyst Recommendations")
-            parts.append(f"- **Recommendation**: {analysts.get('recommendation', 'N/A')}")
-            parts.append(f"- **Number of Analysts**: {analysts.get('num_analysts', 'N/A')}")
-            if analysts.get('target_mean'):
-                parts.append(f"- **Target Price (Mean)**: ${analysts.get('target_mean', 'N/A')}")
-            if analysts.get('target_high') and analysts.get('target_low'):
-                parts.append(f"- **Target Range**: ${analysts.get('target_low')} - ${analysts.get('target_high')}")
+        Args:
+            query: User question about stocks/companies
         
-        parts.append("")
+        Yields:
+            Markdown sections (stock, analysts, fundamentals, news)
         
-        # Fundamentals
-        funds = data.get("fundamentals", {})
-        if "error" not in funds:
-            parts.append("## 💰 Fundamentals")
-            if funds.get('profit_margins'):
-                parts.append(f"- **Profit Margin**: {funds.get('profit_margins', 0)*100:.1f}%")
-            if funds.get('revenue_growth'):
-                parts.append(f"- **Revenue Growth**: {funds.get('revenue_growth', 0)*100:.1f}%")
-            if funds.get('return_on_equity'):
-                parts.append(f"- **Return on Equity**: {funds.get('return_on_equity', 0)*100:.1f}%")
-            parts.append(f"- **Debt to Equity**: {funds.get('debt_to_equity', 'N/A')}")
+        Examples:
+            >>> async for section in agent.stream_query("NVDA stock price"):
+            ...     print(section)
+        """
+        ticker = self._extract_ticker(query)
         
-        parts.append("")
+        if not ticker:
+            logger.info("No ticker found, performing web search")
+            yield await self._web_search_response(query)
+            return
         
-        # News - filter out empty ones
-        news = data.get("news", [])
-        valid_news = [
-            item for item in news 
-            if item.get('title') and item.get('title').strip() and item.get('title') != '****'
-        ]
+        logger.info(f"Streaming REAL financial data for {ticker}")
         
-        if valid_news:
-            parts.append("## 📰 Recent News (yfinance)")
-            for i, item in enumerate(valid_news[:3], 1):
-                parts.append(f"{i}. **{item.get('title')}**")
-                if item.get('publisher'):
-                    parts.append(f"   Publisher: {item.get('publisher')}")
+        stock = yf.Ticker(ticker)
         
-        return "\n".join(parts)
+        async def _section(fetch, render, default):
+            return render(await self._fetch(fetch, ticker, stock, default))
+        
+        sections = [
+            _section(FinancialTools.get_stock_data, lambda d: self._format_stock(ticker, d), None),
+            _section(FinancialTools.get_analyst_recommendations, self._format_analysts, None),
+            _section(FinancialTools.get_fundamentals, self._format_fundamentals, None),
+            _section(FinancialTools.get_company_news, self._format_news, []),
+        ]
+        
+        for next_section in asyncio.as_completed(sections):
+            section = await next_section
+            if section:
+                yield section + "\n\n"
     
     async def compare_stocks(self, tickers: List[str]) -> str:
         """
@@ -302,17 +596,37 @@ class SimpleFinancialAgent:
         
         logger.info(f"Comparing stocks: {', '.join(tickers)}")
         
-        # Fetch data for all tickers concurrently
-        all_data = {}
-        for ticker in tickers:
-            ticker_upper = ticker.upper()
+        upper = [ticker.upper() for ticker in tickers]
+        
+        async def _quotes() -> Dict[str, Dict[str, Any]]:
+            # Prices for all tickers in one request, so the table compares
+            # quotes taken at the same moment
             try:
-                data = await self._fetch_all_data(ticker_upper)
-                all_data[ticker_upper] = data
-                logger.info(f"✅ Fetched data for {ticker_upper}")
-            except Exception as e:
-                logger.error(f"Error fetching {ticker_upper}: {e}")
-                all_data[ticker_upper] = {"error": str(e)}
+                return await asyncio.wait_for(
+                    _yf_call(FinancialTools.get_stocks_batch, upper),
+                    timeout=settings.FETCH_TIMEOUT
+                )
+            except TimeoutError:
+                logger.error(f"[batch] Quotes for {upper} timed out after {settings.FETCH_TIMEOUT}s")
+                return {}
+        
+        async def _details(ticker: str) -> Dict[str, Any]:
+            # Analysts and fundamentals share one Ticker, so its quote
+            # summary is downloaded once
+            stock = yf.Ticker(ticker)
+            analysts, fundamentals = await asyncio.gather(
+                self._fetch(FinancialTools.get_analyst_recommendations, ticker, stock),
+                self._fetch(FinancialTools.get_fundamentals, ticker, stock),
+            )
+            return {"analysts": analysts, "fundamentals": fundamentals}
+        
+        # The quote request runs alongside the per-ticker calls; no price
+        # history or news is fetched for a comparison
+        quotes, *details = await asyncio.gather(_quotes(), *(_details(ticker) for ticker in upper))
+        all_data = {
+            ticker: {"stock": quotes.get(ticker) or {"error": "No quote returned"}, **detail}
+            for ticker, detail in zip(upper, details)
+        }
         
         # Format comparison table
         return self._format_comparison(all_data)
@@ -321,76 +635,22 @@ class SimpleFinancialAgent:
         """Format stock comparison into a readable table"""
         parts = ["# 📊 Stock Comparison\n"]
         
-        tickers = list(all_data.keys())
-        
-        # Helper to get value or N/A
-        def get_val(ticker, key, subkey, format_func=str):
-            try:
-                data = all_data[ticker].get(key, {})
-                if "error" in data:
-                    return "Error"
-                val = data.get(subkey, "N/A")
-                if val == "N/A" or val is None:
-                    return "N/A"
-                return format_func(val)
-            except:
-                return "N/A"
-        
-        # Stock Prices
-        parts.append("## 💰 Current Prices")
-        parts.append("| Ticker | Price | Day Change | Volume |")
-        parts.append("|--------|-------|------------|--------|")
-        for ticker in tickers:
-            price = get_val(ticker, "stock", "current_price", lambda x: f"${x:.2f}")
-            currency = get_val(ticker, "stock", "currency")
-            low = get_val(ticker, "stock", "low", lambda x: f"${x:.2f}")
-            high = get_val(ticker, "stock", "high", lambda x: f"${x:.2f}")
-            volume = get_val(ticker, "stock", "volume", lambda x: f"{x:,}")
-            
-            day_change = f"{low} - {high}" if low != "N/A" and high != "N/A" else "N/A"
-            parts.append(f"| {ticker} | {price} {currency} | {day_change} | {volume} |")
+        rows = [TickerRow.from_data(ticker, data) for ticker, data in all_data.items()]
         
+        parts.append(PRICES_TABLE)
+        parts.extend(f"| {r.ticker} | {r.price} {r.currency} | {r.day_range} | {r.volume} |" for r in rows)
         parts.append("")
         
-        # Market Cap & Valuation
-        parts.append("## 📈 Market Cap & Valuation")
-        parts.append("| Ticker | Market Cap | P/E Ratio | 52-Week Range |")
-        parts.append("|--------|------------|-----------|---------------|")
-        for ticker in tickers:
-            market_cap = get_val(ticker, "stock", "market_cap", lambda x: f"${x/1e12:.2f}T" if x > 1e12 else f"${x/1e9:.1f}B")
-            pe = get_val(ticker, "stock", "pe_ratio", lambda x: f"{x:.1f}")
-            low_52 = get_val(ticker, "stock", "52_week_low", lambda x: f"${x:.2f}")
-            high_52 = get_val(ticker, "stock", "52_week_high", lambda x: f"${x:.2f}")
-            
-            range_52 = f"{low_52} - {high_52}" if low_52 != "N/A" else "N/A"
-            parts.append(f"| {ticker} | {market_cap} | {pe} | {range_52} |")
-        
+        parts.append(VALUATION_TABLE)
+        parts.extend(f"| {r.ticker} | {r.market_cap} | {r.pe} | {r.range_52} |" for r in rows)
         parts.append("")
         
-        # Fundamentals
-        parts.append("## 💼 Fundamentals")
-        parts.append("| Ticker | Profit Margin | Revenue Growth | ROE | Debt/Equity |")
-        parts.append("|--------|---------------|----------------|-----|-------------|")
-        for ticker in tickers:
-            profit = get_val(ticker, "fundamentals", "profit_margins", lambda x: f"{x*100:.1f}%")
-            revenue = get_val(ticker, "fundamentals", "revenue_growth", lambda x: f"{x*100:.1f}%")
-            roe = get_val(ticker, "fundamentals", "return_on_equity", lambda x: f"{x*100:.1f}%")
-            debt = get_val(ticker, "fundamentals", "debt_to_equity", lambda x: f"{x:.2f}")
-            
-            parts.append(f"| {ticker} | {profit} | {revenue} | {roe} | {debt} |")
-        
+        parts.append(FUNDAMENTALS_TABLE)
+        parts.extend(f"| {r.ticker} | {r.profit} | {r.revenue} | {r.roe} | {r.debt} |" for r in rows)
         parts.append("")
         
-        # Analyst Recommendations
-        parts.append("## 🎯 Analyst Recommendations")
-        parts.append("| Ticker | Recommendation | Target Price | # Analysts |")
-        parts.append("|--------|----------------|--------------|------------|")
-        for ticker in tickers:
-            rec = get_val(ticker, "analysts", "recommendation")
-            target = get_val(ticker, "analysts", "target_mean", lambda x: f"${x:.2f}")
-            num = get_val(ticker, "analysts", "num_analysts")
-            
-            parts.append(f"| {ticker} | {rec} | {target} | {num} |")
+        parts.append(ANALYSTS_TABLE)
+        parts.extend(f"| {r.ticker} | {r.rec} | {r.target} | {r.num} |" for r in rows)
         
         parts.append("\n---")
         parts.append("*Data source: yfinance API (real-time)*")
@@ -399,7 +659,7 @@ class SimpleFinancialAgent:
     
     async def _web_search_response(self, query: str) -> str:
         """Fallback to web search for non-financial queries"""
-        results = web_search_tools.search_web(query)
+        results = await web_search_tools.asearch_web(query)
         
         if not results or (len(results) == 1 and "error" in results[0]):
             return "Could not find relevant information for your query."
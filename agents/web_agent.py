@@ -1,4 +1,4 @@
-from langchain.tools import BaseTool, tool
+from langchain.tools import BaseTool, StructuredTool
 from langchain_community.tools import DuckDuckGoSearchRun
 from agents.base_agent import BaseAgent
 from config.settings import settings
@@ -7,66 +7,102 @@ import logging
 
 logger = logging.getLogger(__name__)
 
-# Create tool functions with proper decorators
-@tool
-def search_web_tool(query: str) -> str:
-    """Search the web using DuckDuckGo. Use this for general questions about companies, stocks, or current events. Input should be a search query string."""
+WEB_SEARCH_DESCRIPTION = "Search the web using DuckDuckGo. Use this for general questions about companies, stocks, or current events. Input should be a search query string."
+NEWS_SEARCH_DESCRIPTION = "Search for recent news articles using DuckDuckGo News. Use this for breaking news or recent developments. Input should be a search query string."
+FINANCIAL_NEWS_DESCRIPTION = "Search for financial news about a specific company. Use this for stock-related news and earnings reports. Input should be a company name or ticker symbol."
+
+def _format_results(header: str, results, body_key: str, missing: str, empty: str) -> str:
+    """Format the top search results for the agent"""
+    if not results or (len(results) == 1 and "error" in results[0]):
+        return empty
+
+    formatted = header
+    for i, result in enumerate(results[:3], 1):
+        formatted += f"\n{i}. {result.get('title', 'No title')}\n"
+        formatted += f"   {result.get(body_key, missing)}\n"
+        formatted += f"   Source: {result.get('source', 'Unknown')}\n"
+    return formatted
+
+def _format_web(results) -> str:
+    return _format_results("Web Search Results:\n", results, "snippet", "No description", "No results found or error in search.")
+
+def _format_news(results) -> str:
+    return _format_results("News Results:\n", results, "summary", "No summary", "No news found or error in search.")
+
+def _format_financial_news(company: str, results) -> str:
+    return _format_results(f"Financial News for {company}:\n", results, "summary", "No summary", f"No financial news found for {company}.")
+
+# Each tool has a sync implementation and an async one; LangChain picks the
+# coroutine when the agent runs through ainvoke, so tool calls don't block
+# the event loop
+def search_web(query: str) -> str:
     try:
-        results = web_search_tools.search_web(query)
-        if not results or (len(results) == 1 and "error" in results[0]):
-            return "No results found or error in search."
-        
-        formatted = "Web Search Results:\n"
-        for i, result in enumerate(results[:3], 1):
-            formatted += f"\n{i}. {result.get('title', 'No title')}\n"
-            formatted += f"   {result.get('snippet', 'No description')}\n"
-            formatted += f"   Source: {result.get('source', 'Unknown')}\n"
-        return formatted
+        return _format_web(web_search_tools.search_web(query))
     except Exception as e:
         logger.error(f"Web search error: {e}")
         return f"Error performing web search: {str(e)}"
 
-@tool
-def search_news_tool(query: str) -> str:
-    """Search for recent news articles using DuckDuckGo News. Use this for breaking news or recent developments. Input should be a search query string."""
+async def asearch_web(query: str) -> str:
     try:
-        results = web_search_tools.search_news(query)
-        if not results or (len(results) == 1 and "error" in results[0]):
-            return "No news found or error in search."
-        
-        formatted = "News Results:\n"
-        for i, result in enumerate(results[:3], 1):
-            formatted += f"\n{i}. {result.get('title', 'No title')}\n"
-            formatted += f"   {result.get('summary', 'No summary')}\n"
-            formatted += f"   Source: {result.get('source', 'Unknown')}\n"
-        return formatted
+        return _format_web(await web_search_tools.asearch_web(query))
+    except Exception as e:
+        logger.error(f"Web search error: {e}")
+        return f"Error performing web search: {str(e)}"
+
+def search_news(query: str) -> str:
+    try:
+        return _format_news(web_search_tools.search_news(query))
     except Exception as e:
         logger.error(f"News search error: {e}")
         return f"Error searching news: {str(e)}"
 
-@tool
-def search_financial_news_tool(company: str) -> str:
-    """Search for financial news about a specific company. Use this for stock-related news and earnings reports. Input should be a company name or ticker symbol."""
+async def asearch_news(query: str) -> str:
     try:
-        results = web_search_tools.search_financial_news(company)
-        if not results or (len(results) == 1 and "error" in results[0]):
-            return f"No financial news found for {company}."
-        
-        formatted = f"Financial News for {company}:\n"
-        for i, result in enumerate(results[:3], 1):
-            formatted += f"\n{i}. {result.get('title', 'No title')}\n"
-            formatted += f"   {result.get('summary', 'No summary')}\n"
-            formatted += f"   Source: {result.get('source', 'Unknown')}\n"
-        return formatted
+        return _format_news(await web_search_tools.asearch_news(query))
+    except Exception as e:
+        logger.error(f"News search error: {e}")
+        return f"Error searching news: {str(e)}"
+
+def search_financial_news(company: str) -> str:
+    try:
+        return _format_financial_news(company, web_search_tools.search_financial_news(company))
     except Exception as e:
         logger.error(f"Financial news search error: {e}")
         return f"Error searching financial news: {str(e)}"
 
+async def asearch_financial_news(company: str) -> str:
+    try:
+        return _format_financial_news(company, await web_search_tools.asearch_financial_news(company))
+    except Exception as e:
+        logger.error(f"Financial news search error: {e}")
+        return f"Error searching financial news: {str(e)}"
+
+search_web_tool = StructuredTool.from_function(
+    func=search_web,
+    coroutine=asearch_web,
+    name="search_web_tool",
+    description=WEB_SEARCH_DESCRIPTION
+)
+
+search_news_tool = StructuredTool.from_function(
+    func=search_news,
+    coroutine=asearch_news,
+    name="search_news_tool",
+    description=NEWS_SEARCH_DESCRIPTION
+)
+
+search_financial_news_tool = StructuredTool.from_function(
+    func=search_financial_news,
+    coroutine=asearch_financial_news,
+    name="search_financial_news_tool",
+    description=FINANCIAL_NEWS_DESCRIPTION
+)
+
 class WebSearchAgent(BaseAgent):
     """Web search agent for current information"""
     
     def __init__(self):
-        # Create web search tools using the new tool decorator
+        # Web search tools with sync and async implementations
         tools = [
             search_web_tool,
             search_news_tool,
@@ -6,7 +6,9 @@ This module provides a FastAPI-based REST API for the Financial Assistant.
 Endpoints:
     GET  /health         - Health check
     POST /query          - Process financial query
+    POST /query/stream   - Stream a query answer (Server-Sent Events)
     GET  /stocks/{ticker} - Get stock data
+    GET  /stocks/{ticker}/stream - Stream stock data sections
     POST /clear-cache    - Clear cache
     GET  /docs           - OpenAPI documentation (auto-generated)
 
@@ -29,31 +31,76 @@ Example Response:
       "response_time": 2.45
     }
 """
-from fastapi import FastAPI, HTTPException
+from fastapi import APIRouter, FastAPI, HTTPException, Request, Response
 from fastapi.middleware.cors import CORSMiddleware
 from pydantic import BaseModel, Field
-from typing import Optional, List
+from typing import Dict, Optional, List
 import uvicorn
+import asyncio
+import orjson
+import functools
 import logging
 import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import asynccontextmanager
 
 from agents.orchestrator import MultiAgentOrchestrator
 from agents.simple_financial_agent import SimpleFinancialAgent
-from tools.chart_tools import ChartTools
-from fastapi.responses import FileResponse
+from tools.chart_tools import ChartTools, warm_up as warm_up_charts
+from config.settings import settings
+from cache.cache_manager import cache_manager, digest
+from cache.semantic_cache import semantic_cache
+from fastapi.responses import FileResponse, StreamingResponse
 import os
 
 # Setup logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# Agents are created on first use, so importing the app (reload, /health) stays cheap
+@functools.lru_cache(maxsize=1)
+def get_orchestrator() -> MultiAgentOrchestrator:
+    return MultiAgentOrchestrator()
+
+@functools.lru_cache(maxsize=1)
+def get_financial_agent() -> SimpleFinancialAgent:
+    return SimpleFinancialAgent()
+
+@functools.lru_cache(maxsize=1)
+def get_chart_tools() -> ChartTools:
+    return ChartTools()
+
+def _warmup():
+    """Create all agents up front (WARMUP=true) instead of on the first request"""
+    try:
+        get_orchestrator()
+        get_financial_agent()
+        get_chart_tools()
+        logger.info("✅ Agents warmed up")
+    except Exception as e:
+        logger.warning("⚠️  Warmup failed: %s. Agents will be created on first request.", e)
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # asyncio.to_thread uses the default executor; size it for bursts of
+    # blocking yfinance/search calls instead of min(32, cpu + 4)
+    executor = ThreadPoolExecutor(max_workers=settings.THREAD_POOL_SIZE)
+    asyncio.get_running_loop().set_default_executor(executor)
+    # Pay matplotlib's first-draw cost (fonts, renderer) before serving charts
+    await asyncio.to_thread(warm_up_charts)
+    if settings.WARMUP:
+        await asyncio.to_thread(_warmup)
+    yield
+    executor.shutdown(wait=False)
+
 # Initialize FastAPI
 app = FastAPI(
     title="Financial AI Assistant API",
     description="AI-powered financial analysis with real-time data (Tool-First Architecture)",
     version="2.0.0",
     docs_url="/docs",
-    redoc_url="/redoc"
+    redoc_url="/redoc",
+    lifespan=lifespan
 )
 
 # CORS middleware for web client access
@@ -65,10 +112,53 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-# Initialize agents
-orchestrator = MultiAgentOrchestrator()
-financial_agent = SimpleFinancialAgent()
-chart_tools = ChartTools()
+# API endpoints live on a router so app.py can mount them without a second copy
+router = APIRouter()
+
+# ============================================================================
+# Precomputed Payloads
+# ============================================================================
+
+# Static responses are serialized once; endpoints that report a timestamp
+# append it to a precomputed '{...,"timestamp":' prefix
+def _timestamp_prefix(payload: dict) -> bytes:
+    return orjson.dumps(payload)[:-1] + b',"timestamp":'
+
+def _with_timestamp(prefix: bytes, headers: Optional[Dict[str, str]] = None) -> Response:
+    return Response(prefix + repr(time.time()).encode() + b"}", media_type="application/json", headers=headers)
+
+_ROOT_JSON = orjson.dumps({
+    "message": "Financial AI Assistant API",
+    "version": "2.0.0",
+    "architecture": "Tool-First (prevents hallucinations)",
+    "docs": "/docs",
+    "health": "/health"
+})
+
+_HEALTH_PREFIX = _timestamp_prefix({
+    "status": "healthy",
+    "service": "financial_assistant",
+    "version": "2.0.0"
+})
+
+_STATUS_PREFIX = _timestamp_prefix({
+    "service": "financial_assistant",
+    "version": "2.0.0",
+    "architecture": "Tool-First",
+    "agents": {
+        "orchestrator": "active",
+        "financial_agent": "active"
+    },
+    "data_sources": {
+        "yfinance": "active",
+        "duckduckgo": "active"
+    },
+    "cache": "redis/in-memory"
+})
+# Everything but the timestamp is static. The ETag covers that part only,
+# so it is weak: bodies differing just in timestamp count as equivalent
+_STATUS_HEADERS = {"ETag": f'W/"{digest(_STATUS_PREFIX)}"', "Cache-Control": "max-age=5"}
+
 
 # ============================================================================
 # Pydantic Models
@@ -104,6 +194,45 @@ class HealthResponse(BaseModel):
     version: str
     timestamp: float
 
+class StockResponse(BaseModel):
+    """Response model for /stocks endpoint"""
+    ticker: str
+    data: str = Field(..., description="Markdown-formatted stock data")
+    success: bool
+    response_time: float
+    timestamp: float
+
+class ComparisonResponse(BaseModel):
+    """Response model for /compare-stocks endpoint"""
+    tickers: List[str]
+    comparison: str = Field(..., description="Markdown-formatted comparison tables")
+    success: bool
+    response_time: float
+    timestamp: float
+
+class InfoResponse(BaseModel):
+    """Response model for / endpoint"""
+    message: str
+    version: str
+    architecture: str
+    docs: str
+    health: str
+
+class ClearCacheResponse(BaseModel):
+    """Response model for /clear-cache endpoint"""
+    success: bool
+    message: str
+
+class StatusResponse(BaseModel):
+    """Response model for /status endpoint"""
+    service: str
+    version: str
+    architecture: str
+    agents: Dict[str, str]
+    data_sources: Dict[str, str]
+    cache: str
+    timestamp: float
+
 class ErrorResponse(BaseModel):
     """Error response model"""
     detail: str
@@ -113,39 +242,30 @@ class ErrorResponse(BaseModel):
 # API Endpoints
 # ============================================================================
 
-@app.get("/", tags=["Info"])
-async def root():
+# Endpoints below return pre-serialized bytes, so their models are only
+# documented (responses=) rather than used to validate the response
+@app.get("/", tags=["Info"], responses={200: {"model": InfoResponse}})
+async def root() -> Response:
     """
     Root endpoint with API information.
     
     Returns:
         API welcome message and links
     """
-    return {
-        "message": "Financial AI Assistant API",
-        "version": "2.0.0",
-        "architecture": "Tool-First (prevents hallucinations)",
-        "docs": "/docs",
-        "health": "/health"
-    }
+    return Response(_ROOT_JSON, media_type="application/json")
 
-@app.get("/health", response_model=HealthResponse, tags=["Health"])
-async def health_check():
+@router.get("/health", tags=["Health"], responses={200: {"model": HealthResponse}})
+async def health_check() -> Response:
     """
     Health check endpoint for monitoring.
     
     Returns:
         Service health status
     """
-    return {
-        "status": "healthy",
-        "service": "financial_assistant",
-        "version": "2.0.0",
-        "timestamp": time.time()
-    }
+    return _with_timestamp(_HEALTH_PREFIX)
 
-@app.post("/query", response_model=QueryResponse, tags=["Query"])
-async def process_query(request: QueryRequest):
+@router.post("/query", response_model=QueryResponse, tags=["Query"])
+async def process_query(request: QueryRequest) -> QueryResponse:
     """
     Process a natural language financial query.
     
@@ -172,13 +292,13 @@ async def process_query(request: QueryRequest):
         ```
     """
     try:
-        start_time = time.time()
+        start_time = time.perf_counter()
         
-        logger.info(f"Processing query: {request.query[:50]}...")
-        response = await orchestrator.query(request.query)
-        response_time = time.time() - start_time
+        logger.info("Processing query: %s...", request.query[:50])
+        response = await get_orchestrator().query(request.query)
+        response_time = time.perf_counter() - start_time
         
-        logger.info(f"Query completed in {response_time:.2f}s")
+        logger.info("Query completed in %.2fs", response_time)
         
         return QueryResponse(
             response=response,
@@ -187,14 +307,61 @@ async def process_query(request: QueryRequest):
         )
         
     except Exception as e:
-        logger.error(f"API error: {e}", exc_info=True)
+        logger.error("API error: %s", e, exc_info=True)
+        raise HTTPException(
+            status_code=500,
+            detail=f"Query processing failed: {str(e)}"
+        )
+
+@router.post("/query/stream", tags=["Query"])
+async def stream_query(request: QueryRequest):
+    """
+    Process a financial query, streaming the answer as Server-Sent Events.
+    
+    Same pipeline as /query, but each chunk (LLM tokens when the answer is
+    synthesized) is sent as soon as it is produced.
+    
+    Args:
+        request: Query request with natural language question
+    
+    Returns:
+        text/event-stream of `data: {"delta": "..."}` events, then
+        `event: done` (or `event: error` with a `detail`)
+    
+    Example:
+        ```
+        curl -N -X POST http://localhost:8000/query/stream \\
+             -H "Content-Type: application/json" \\
+             -d '{"query": "NVIDIA stock price and recent news"}'
+        ```
+    """
+    try:
+        orchestrator = get_orchestrator()
+    except Exception as e:
+        logger.error("API error: %s", e, exc_info=True)
         raise HTTPException(
             status_code=500,
             detail=f"Query processing failed: {str(e)}"
         )
+    
+    async def events():
+        logger.info("Streaming query: %s...", request.query[:50])
+        try:
+            async for chunk in orchestrator.query_stream(request.query):
+                yield b"data: " + orjson.dumps({"delta": chunk}) + b"\n\n"
+            yield b"event: done\ndata: {}\n\n"
+        except Exception as e:
+            logger.error("Streaming query error: %s", e, exc_info=True)
+            yield b"event: error\ndata: " + orjson.dumps({"detail": str(e)}) + b"\n\n"
+    
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache"}
+    )
 
-@app.get("/stocks/{ticker}", tags=["Stocks"])
-async def get_stock_data(ticker: str):
+@router.get("/stocks/{ticker}", response_model=StockResponse, tags=["Stocks"])
+async def get_stock_data(request: Request, http_response: Response, ticker: str) -> StockResponse:
     """
     Get detailed stock data for a specific ticker.
     
@@ -213,11 +380,16 @@ async def get_stock_data(ticker: str):
         ```
     """
     try:
-        start_time = time.time()
+        start_time = time.perf_counter()
         
         query = f"Get detailed stock data for {ticker}"
-        response = await financial_agent.query(query)
-        response_time = time.time() - start_time
+        response = await get_financial_agent().query(query)
+        response_time = time.perf_counter() - start_time
+        
+        # Same data as the client's copy: skip the body
+        not_modified = _conditional(request, http_response, response, STOCK_CACHE_CONTROL)
+        if not_modified:
+            return not_modified
         
         return {
             "ticker": ticker.upper(),
@@ -228,14 +400,39 @@ async def get_stock_data(ticker: str):
         }
         
     except Exception as e:
-        logger.error(f"Stock data error for {ticker}: {e}")
+        logger.error("Stock data error for %s: %s", ticker, e)
         raise HTTPException(
             status_code=500,
             detail=f"Failed to fetch data for {ticker}: {str(e)}"
         )
 
-@app.post("/compare-stocks", tags=["Stocks"])
-async def compare_stocks(tickers: List[str]):
+@router.get("/stocks/{ticker}/stream", tags=["Stocks"])
+async def stream_stock_data(ticker: str):
+    """
+    Stream detailed stock data for a specific ticker.
+    
+    Same content as /stocks/{ticker}, sent as Markdown sections as soon
+    as each one is fetched (fastest first).
+    
+    Args:
+        ticker: Stock ticker symbol (e.g., NVDA, AAPL)
+    
+    Returns:
+        text/markdown stream of stock, analyst, fundamentals and news sections
+    
+    Example:
+        ```
+        curl -N http://localhost:8000/stocks/NVDA/stream
+        ```
+    """
+    query = f"Get detailed stock data for {ticker}"
+    return StreamingResponse(
+        get_financial_agent().stream_query(query),
+        media_type="text/markdown"
+    )
+
+@router.post("/compare-stocks", response_model=ComparisonResponse, tags=["Stocks"])
+async def compare_stocks(tickers: List[str]) -> ComparisonResponse:
     """
     Compare multiple stocks side-by-side.
     
@@ -281,13 +478,13 @@ async def compare_stocks(tickers: List[str]):
                 detail="Maximum 5 tickers allowed for comparison"
             )
         
-        start_time = time.time()
+        start_time = time.perf_counter()
         
-        logger.info(f"Comparing stocks: {', '.join(tickers)}")
-        comparison = await financial_agent.compare_stocks(tickers)
-        response_time = time.time() - start_time
+        logger.info("Comparing stocks: %s", ', '.join(tickers))
+        comparison = await get_financial_agent().compare_stocks(tickers)
+        response_time = time.perf_counter() - start_time
         
-        logger.info(f"Comparison completed in {response_time:.2f}s")
+        logger.info("Comparison completed in %.2fs", response_time)
         
         return {
             "tickers": [t.upper() for t in tickers],
@@ -300,14 +497,14 @@ async def compare_stocks(tickers: List[str]):
     except HTTPException:
         raise
     except Exception as e:
-        logger.error(f"Comparison error: {e}")
+        logger.error("Comparison error: %s", e)
         raise HTTPException(
             status_code=500,
             detail=f"Failed to compare stocks: {str(e)}"
         )
 
-@app.post("/clear-cache", tags=["Admin"])
-async def clear_cache():
+@router.post("/clear-cache", tags=["Admin"])
+async def clear_cache() -> ClearCacheResponse:
     """
     Clear the application cache (Redis + in-memory).
     
@@ -317,20 +514,61 @@ async def clear_cache():
         Success message
     """
     try:
-        orchestrator.clear_memory()
+        # Caches are shared module state - no need to build the orchestrator for this
+        cache_manager.clear()
+        semantic_cache.clear()
         return {
             "success": True,
             "message": "Cache cleared successfully"
         }
     except Exception as e:
-        logger.error(f"Cache clear error: {e}")
+        logger.error("Cache clear error: %s", e)
         raise HTTPException(
             status_code=500,
             detail=f"Failed to clear cache: {str(e)}"
         )
 
-@app.get("/chart/{ticker}", tags=["Charts"])
+STOCK_CACHE_CONTROL = f"max-age={settings.STOCK_CACHE_TTL}, stale-while-revalidate=60"
+
+def _conditional(request: Request, http_response: Response, content: str, cache_control: str) -> Optional[Response]:
+    """Tag a JSON response with an ETag of its content; return a 304 if the client has it"""
+    headers = {"ETag": f'"{digest(content.encode())}"', "Cache-Control": cache_control}
+    if request.headers.get("if-none-match") == headers["ETag"]:
+        return Response(status_code=304, headers=headers)
+    http_response.headers.update(headers)
+    return None
+
+async def _render_chart(request: Request, plot, **kwargs) -> Response:
+    """Render a chart in a worker thread and serve it"""
+    def _render():
+        chart_path = plot(**kwargs)
+        return chart_path, os.stat(chart_path)
+    
+    try:
+        chart_path, stat_result = await asyncio.to_thread(_render)
+    except FileNotFoundError:
+        raise HTTPException(status_code=404, detail="Chart not found")
+    return _chart_response(request, chart_path, stat_result)
+
+def _chart_response(request: Request, chart_path: str, stat_result: os.stat_result) -> Response:
+    """Serve a chart PNG, answering 304 when the client's ETag still matches"""
+    response = FileResponse(
+        chart_path,
+        media_type="image/png",
+        filename=os.path.basename(chart_path),
+        stat_result=stat_result,
+        headers={"Cache-Control": f"public, max-age={settings.CHART_CACHE_TTL}"}
+    )
+    if request.headers.get("if-none-match") == response.headers["etag"]:
+        return Response(
+            status_code=304,
+            headers={k: response.headers[k] for k in ("etag", "last-modified", "cache-control")}
+        )
+    return response
+
+@router.get("/chart/{ticker}", tags=["Charts"])
 async def get_stock_chart(
+    request: Request,
     ticker: str,
     period: str = "1y",
     show_ma: bool = True,
@@ -357,35 +595,29 @@ async def get_stock_chart(
         ```
     """
     try:
-        logger.info(f"Generating chart for {ticker} ({period})")
+        logger.info("Generating chart for %s (%s)", ticker, period)
         
-        # Generate chart
-        chart_path = chart_tools.plot_stock_history(
+        # Render off the event loop (matplotlib + yfinance are blocking)
+        return await _render_chart(
+            request,
+            get_chart_tools().plot_stock_history,
             ticker=ticker,
             period=period,
             show_ma=show_ma,
             show_volume=show_volume
         )
-        
-        # Return image file
-        if os.path.exists(chart_path):
-            return FileResponse(
-                chart_path,
-                media_type="image/png",
-                filename=os.path.basename(chart_path)
-            )
-        else:
-            raise HTTPException(status_code=404, detail="Chart not found")
-            
+    
+    except HTTPException:
+        raise
     except Exception as e:
-        logger.error(f"Chart generation error: {e}")
+        logger.error("Chart generation error: %s", e)
         raise HTTPException(
             status_code=500,
             detail=f"Failed to generate chart: {str(e)}"
         )
 
-@app.post("/chart/compare", tags=["Charts"])
-async def get_comparison_chart(tickers: List[str], period: str = "1y", normalize: bool = True):
+@router.post("/chart/compare", tags=["Charts"])
+async def get_comparison_chart(request: Request, tickers: List[str], period: str = "1y", normalize: bool = True):
     """
     Generate and serve a stock comparison chart.
     
@@ -414,57 +646,43 @@ async def get_comparison_chart(tickers: List[str], period: str = "1y", normalize
         if len(tickers) > 5:
             raise HTTPException(status_code=400, detail="Maximum 5 tickers")
         
-        logger.info(f"Generating comparison chart for {', '.join(tickers)}")
+        logger.info("Generating comparison chart for %s", ', '.join(tickers))
         
-        # Generate chart
-        chart_path = chart_tools.plot_comparison_chart(
+        # Render off the event loop (matplotlib + yfinance are blocking)
+        return await _render_chart(
+            request,
+            get_chart_tools().plot_comparison_chart,
             tickers=tickers,
             period=period,
             normalize=normalize
         )
         
-        # Return image
-        if os.path.exists(chart_path):
-            return FileResponse(
-                chart_path,
-                media_type="image/png",
-                filename=os.path.basename(chart_path)
-            )
-        else:
-            raise HTTPException(status_code=404, detail="Chart not found")
-            
     except HTTPException:
         raise
     except Exception as e:
-        logger.error(f"Comparison chart error: {e}")
+        logger.error("Comparison chart error: %s", e)
         raise HTTPException(
             status_code=500,
             detail=f"Failed to generate comparison chart: {str(e)}"
         )
 
-@app.get("/status", tags=["Health"])
-async def get_status():
+@router.get(
+    "/status",
+    tags=["Health"],
+    responses={200: {"model": StatusResponse}, 304: {"description": "Status unchanged (ETag matched)"}}
+)
+async def get_status(request: Request) -> Response:
     """
     Get detailed service status including agents.
     
     Returns:
         Comprehensive service status
     """
-    return {
-        "service": "financial_assistant",
-        "version": "2.0.0",
-        "architecture": "Tool-First",
-        "agents": {
-            "orchestrator": "active",
-            "financial_agent": "active"
-        },
-        "data_sources": {
-            "yfinance": "active",
-            "duckduckgo": "active"
-        },
-        "cache": "redis/in-memory",
-        "timestamp": time.time()
-    }
+    if request.headers.get("if-none-match") == _STATUS_HEADERS["ETag"]:
+        return Response(status_code=304, headers=_STATUS_HEADERS)
+    return _with_timestamp(_STATUS_PREFIX, _STATUS_HEADERS)
+
+app.include_router(router)
 
 # ============================================================================
 # Server Startup
@@ -472,10 +690,15 @@ async def get_status():
 
 if __name__ == "__main__":
     logger.info("Starting Financial AI Assistant API...")
+    # "auto" picks uvloop and httptools when installed (uvicorn[standard]),
+    # falling back to asyncio/h11 where uvloop isn't available (Windows)
     uvicorn.run(
         "api.server:app",
         host="0.0.0.0",
         port=8000,
-        reload=True,
+        loop="auto",
+        http="auto",
+        workers=settings.WORKERS,
+        reload=settings.RELOAD,
         log_level="info"
     )
\ No newline at end of file
@@ -51,13 +51,13 @@ def test_query_nvidia():
         "user_id": "test_user"
     }
     
-    start = time.time()
+    start = time.perf_counter()
     response = requests.post(
         f"{BASE_URL}/query",
         json=payload,
         headers={"Content-Type": "application/json"}
     )
-    elapsed = time.time() - start
+    elapsed = time.perf_counter() - start
     
     print(f"Status Code: {response.status_code}")
     print(f"Request took: {elapsed:.2f}s")
@@ -21,9 +21,13 @@ Endpoints:
 """
 from fastapi import FastAPI
 from fastapi.staticfiles import StaticFiles
-from fastapi.responses import FileResponse
+from fastapi.responses import FileResponse, Response
 from fastapi.middleware.cors import CORSMiddleware
 import os
+import orjson
+
+from api.server import lifespan, router
+from config.settings import settings
 
 # Create a new FastAPI app for the combined frontend + API
 app = FastAPI(
@@ -31,7 +35,8 @@ app = FastAPI(
     description="AI-powered financial analysis with web interface and REST API",
     version="2.0.0",
     docs_url="/docs",
-    redoc_url="/redoc"
+    redoc_url="/redoc",
+    lifespan=lifespan  # Shared startup: default executor size, optional warmup
 )
 
 # CORS middleware
@@ -47,24 +52,19 @@ app.add_middleware(
 static_dir = os.path.join(os.path.dirname(__file__), "static")
 app.mount("/static", StaticFiles(directory=static_dir), name="static")
 
-# Import and include API routes
-from api.server import (
-    health_check, process_query, get_stock_data, 
-    compare_stocks, clear_cache, get_stock_chart,
-    get_comparison_chart, get_status
-)
+# Include API routes (shared with api.server)
+app.include_router(router)
 
-# Register API endpoints
-app.get("/health", tags=["Health"])(health_check)
-app.post("/query", tags=["Query"])(process_query)
-app.get("/stocks/{ticker}", tags=["Stocks"])(get_stock_data)
-app.post("/compare-stocks", tags=["Stocks"])(compare_stocks)
-app.post("/clear-cache", tags=["Admin"])(clear_cache)
-app.get("/chart/{ticker}", tags=["Charts"])(get_stock_chart)
-app.post("/chart/compare", tags=["Charts"])(get_comparison_chart)
-app.get("/status", tags=["Health"])(get_status)
+# API info endpoint (moved from /), serialized once
+_API_INFO_JSON = orjson.dumps({
+    "message": "Financial AI Assistant API",
+    "version": "2.0.0",
+    "architecture": "Tool-First (prevents hallucinations)",
+    "frontend": "/",
+    "docs": "/docs",
+    "health": "/health"
+})
 
-# API info endpoint (moved from /)
 @app.get("/api", tags=["Info"])
 async def api_info():
     """
@@ -73,14 +73,7 @@ async def api_info():
     Returns:
         API details and available endpoints
     """
-    return {
-        "message": "Financial AI Assistant API",
-        "version": "2.0.0",
-        "architecture": "Tool-First (prevents hallucinations)",
-        "frontend": "/",
-        "docs": "/docs",
-        "health": "/health"
-    }
+    return Response(_API_INFO_JSON, media_type="application/json")
 
 # Serve frontend at root
 @app.get("/", include_in_schema=False)
@@ -96,10 +89,15 @@ async def serve_frontend():
 
 if __name__ == "__main__":
     import uvicorn
+    # "auto" picks uvloop and httptools when installed (uvicorn[standard]),
+    # falling back to asyncio/h11 where uvloop isn't available (Windows)
     uvicorn.run(
         "app:app",
         host="0.0.0.0",
         port=8000,
-        reload=True,
+        loop="auto",
+        http="auto",
+        workers=settings.WORKERS,
+        reload=settings.RELOAD,
         log_level="info"
     )
@@ -1,64 +1,157 @@
+import asyncio
+import threading
+import time
 import redis
 import pickle
-import json
-from typing import Any, Optional
-from datetime import datetime, timedelta
+import socket
+import orjson
+from collections import OrderedDict, defaultdict
+from typing import Any, Awaitable, Callable, Dict, Optional, Set, Tuple
 import hashlib
 from config.settings import settings
 import logging
 
+try:
+    import xxhash  # optional: much faster non-cryptographic key hashing
+except ImportError:
+    xxhash = None
+
+try:
+    import diskcache  # optional: persistent fallback cache when Redis is down
+except ImportError:
+    diskcache = None
+
 logger = logging.getLogger(__name__)
 
+# TCP keepalive tuning for pooled Redis sockets; the constants are
+# platform-specific (TCP_KEEPIDLE is missing on macOS), so only set what exists
+_KEEPALIVE_OPTIONS = {
+    getattr(socket, name): value
+    for name, value in (("TCP_KEEPIDLE", 60), ("TCP_KEEPINTVL", 10), ("TCP_KEEPCNT", 3))
+    if hasattr(socket, name)
+}
+
+# Result an in-flight computation resolves to when its leader was cancelled
+# before finishing; waiters then compute the value themselves
+_ABANDONED = object()
+
+# One-byte tags on stored Redis values: JSON for plain data, pickle for the rest
+_JSON_TAG = b"J"
+_PICKLE_TAG = b"P"
+
+def _dumps(value: Any) -> bytes:
+    """Serialize a cache value, preferring orjson over pickle"""
+    try:
+        return _JSON_TAG + orjson.dumps(value)
+    except TypeError:
+        # Not JSON-serializable (numpy scalars, datetimes as keys, objects...)
+        return _PICKLE_TAG + pickle.dumps(value)
+
+def _loads(data: bytes) -> Any:
+    """Deserialize a value written by _dumps"""
+    tag, payload = data[:1], data[1:]
+    if tag == _JSON_TAG:
+        return orjson.loads(payload)
+    if tag == _PICKLE_TAG:
+        return pickle.loads(payload)
+    # Untagged entry written before values were tagged
+    return pickle.loads(data)
+
+def digest(data: bytes) -> str:
+    """Fast hex digest for cache keys and ETags (xxh3 when available, else md5)"""
+    if xxhash is not None:
+        return xxhash.xxh3_64_hexdigest(data)
+    return hashlib.md5(data).hexdigest()
+
 class CacheManager:
     """Simple cache manager without vector embeddings"""
     
     def __init__(self, redis_url: Optional[str] = None):
         self.redis_client = None
-        self._in_memory_cache = {}
+        # Disk fallback (DISK_CACHE_DIR), used instead of memory when configured
+        self.disk_cache = None
+        # In-memory fallback: LRU of key -> (monotonic expiry, value), bounded
+        # by MEMORY_CACHE_MAX_ENTRIES, plus a prefix -> keys index for clear()
+        self._in_memory_cache: "OrderedDict[str, Tuple[float, Any]]" = OrderedDict()
+        self._prefix_index: Dict[str, Set[str]] = defaultdict(set)
+        self._memory_lock = threading.Lock()
+        self.max_entries = settings.MEMORY_CACHE_MAX_ENTRIES
+        # Pending computations by key (single-flight for get_or_compute)
+        self._inflight: Dict[str, asyncio.Future] = {}
         self._setup_redis(redis_url or settings.redis_url)
+        if self.redis_client is None and settings.DISK_CACHE_DIR:
+            self._setup_disk(settings.DISK_CACHE_DIR)
     
     def _setup_redis(self, redis_url: str):
         """Setup Redis connection with fallback"""
         try:
-            self.redis_client = redis.Redis.from_url(
+            # Sized like the worker thread pool so every blocking call can hold a
+            # connection; past that, callers wait for one instead of failing
+            pool = redis.BlockingConnectionPool.from_url(
                 redis_url,
+                max_connections=settings.THREAD_POOL_SIZE,
+                timeout=5,
                 decode_responses=False,
                 socket_timeout=5,
-                socket_connect_timeout=5
+                socket_connect_timeout=5,
+                socket_keepalive=True,
+                socket_keepalive_options=_KEEPALIVE_OPTIONS
             )
+            self.redis_client = redis.Redis(connection_pool=pool)
             self.redis_client.ping()
             logger.info("✅ Connected to Redis cache")
         except Exception as e:
-            logger.warning(f"⚠️  Redis not available: {e}. Using in-memory cache.")
+            logger.warning("⚠️  Redis not available: %s. Using in-memory cache.", e)
             self.redis_client = None
     
+    def _setup_disk(self, directory: str):
+        """Setup the persistent disk cache so entries survive restarts"""
+        if diskcache is None:
+            logger.warning("⚠️  DISK_CACHE_DIR is set but diskcache is not installed. Using in-memory cache.")
+            return
+        try:
+            self.disk_cache = diskcache.Cache(directory)
+            # Entries are tagged with their key prefix so clear(prefix) can evict by tag
+            self.disk_cache.create_tag_index()
+            logger.info("✅ Using disk cache at %s", directory)
+        except Exception as e:
+            logger.warning("⚠️  Disk cache not available: %s. Using in-memory cache.", e)
+            self.disk_cache = None
+    
     def _generate_key(self, prefix: str, data: Any) -> str:
         """Generate consistent cache key"""
         if isinstance(data, str):
-            data_str = data
+            data_bytes = data.encode()
         else:
-            data_str = json.dumps(data, sort_keys=True, default=str)
-        return f"{prefix}:{hashlib.md5(data_str.encode()).hexdigest()}"
+            data_bytes = orjson.dumps(
+                data,
+                default=str,
+                option=orjson.OPT_SORT_KEYS | orjson.OPT_NON_STR_KEYS
+            )
+        return f"{prefix}:{digest(data_bytes)}"
     
     def get(self, key: str) -> Optional[Any]:
         """Get cached value"""
         try:
             if self.redis_client:
                 cached = self.redis_client.get(key)
-                return pickle.loads(cached) if cached else None
+                return _loads(cached) if cached else None
+            elif self.disk_cache is not None:
+                return self.disk_cache.get(key)
             else:
-                # Check in-memory cache expiration
-                cached_item = self._in_memory_cache.get(key)
-                if cached_item:
-                    expires = cached_item.get("expires")
-                    if expires and datetime.now() < expires:
-                        return cached_item["value"]
-                    else:
+                with self._memory_lock:
+                    cached_item = self._in_memory_cache.get(key)
+                    if cached_item is None:
+                        return None
+                    expires, value = cached_item
+                    if time.monotonic() >= expires:
                         # Remove expired item
-                        del self._in_memory_cache[key]
-                return None
+                        self._forget(key)
+                        return None
+                    self._in_memory_cache.move_to_end(key)
+                    return value
         except Exception as e:
-            logger.error(f"Cache get error: {e}")
+            logger.error("Cache get error: %s", e)
             return None
     
     def set(self, key: str, value: Any, ttl: Optional[int] = None):
@@ -68,46 +161,116 @@ class CacheManager:
                 self.redis_client.setex(
                     key,
                     ttl or settings.CACHE_TTL,
-                    pickle.dumps(value)
+                    _dumps(value)
+                )
+            elif self.disk_cache is not None:
+                self.disk_cache.set(
+                    key,
+                    value,
+                    expire=ttl or settings.CACHE_TTL,
+                    tag=key.partition(":")[0]
                 )
             else:
-                expires = datetime.now() + timedelta(seconds=ttl or settings.CACHE_TTL)
-                self._in_memory_cache[key] = {
-                    "value": value,
-                    "expires": expires
-                }
+                expires = time.monotonic() + (ttl or settings.CACHE_TTL)
+                with self._memory_lock:
+                    self._in_memory_cache[key] = (expires, value)
+                    self._in_memory_cache.move_to_end(key)
+                    self._prefix_index[key.partition(":")[0]].add(key)
+                    while len(self._in_memory_cache) > self.max_entries:
+                        # Evict the least recently used entry
+                        self._forget(next(iter(self._in_memory_cache)))
         except Exception as e:
-            logger.error(f"Cache set error: {e}")
+            logger.error("Cache set error: %s", e)
+    
+    def _forget(self, key: str):
+        """Drop an in-memory entry and its prefix index entry (lock held)"""
+        self._in_memory_cache.pop(key, None)
+        prefix = key.partition(":")[0]
+        keys = self._prefix_index.get(prefix)
+        if keys is not None:
+            keys.discard(key)
+            if not keys:
+                del self._prefix_index[prefix]
+    
+    async def get_or_compute(
+        self,
+        key: str,
+        factory: Callable[[], Awaitable[Any]],
+        ttl: Optional[int] = None,
+        cacheable: Optional[Callable[[Any], bool]] = None
+    ) -> Any:
+        """Get a cached value, or compute it once for all concurrent callers.
+        
+        Callers that miss the cache while a computation for the same key is
+        running await its result instead of starting their own. If that
+        computation is cancelled, its waiters retry rather than being
+        cancelled with it. The value is cached unless cacheable(value)
+        returns False.
+        """
+        cached = self.get(key)
+        if cached is not None:
+            return cached
+        
+        inflight = self._inflight.get(key)
+        if inflight is not None:
+            value = await asyncio.shield(inflight)
+            if value is not _ABANDONED:
+                return value
+            return await self.get_or_compute(key, factory, ttl=ttl, cacheable=cacheable)
+        
+        future = asyncio.get_running_loop().create_future()
+        self._inflight[key] = future
+        try:
+            value = await factory()
+            if cacheable is None or cacheable(value):
+                self.set(key, value, ttl=ttl)
+            future.set_result(value)
+            return value
+        except Exception as e:
+            future.set_exception(e)
+            future.exception()  # Retrieved here; waiters still get it re-raised
+            raise
+        finally:
+            if self._inflight.get(key) is future:
+                del self._inflight[key]
+            if not future.done():
+                # Cancelled (or timed out) before finishing: waiters weren't
+                future.set_result(_ABANDONED)
     
     def clear(self, prefix: str = None):
         """Clear cache entries"""
         try:
             if self.redis_client and prefix:
-                # Iterate through keys with pattern
-                cursor = 0
-                while True:
-                    cursor, keys = self.redis_client.scan(
-                        cursor=cursor,
-                        match=f"{prefix}:*",
-                        count=100
-                    )
-                    if keys:
-                        self.redis_client.delete(*keys)
-                    if cursor == 0:
-                        break
+                # UNLINK frees memory in the background; the pipeline sends
+                # all batches in one network write
+                with self.redis_client.pipeline(transaction=False) as pipe:
+                    batch = []
+                    for key in self.redis_client.scan_iter(match=f"{prefix}:*", count=500):
+                        batch.append(key)
+                        if len(batch) == 500:
+                            pipe.unlink(*batch)
+                            batch = []
+                    if batch:
+                        pipe.unlink(*batch)
+                    pipe.execute()
             elif self.redis_client:
                 self.redis_client.flushdb()
-            else:
+            elif self.disk_cache is not None:
                 if prefix:
-                    # Filter in-memory cache
-                    keys_to_delete = [k for k in self._in_memory_cache.keys() 
-                                    if k.startswith(f"{prefix}:")]
-                    for k in keys_to_delete:
-                        del self._in_memory_cache[k]
+                    self.disk_cache.evict(prefix)
                 else:
-                    self._in_memory_cache.clear()
+                    self.disk_cache.clear()
+            else:
+                with self._memory_lock:
+                    if prefix:
+                        # Only touch the keys indexed under this prefix
+                        for k in list(self._prefix_index.get(prefix, ())):
+                            self._forget(k)
+                    else:
+                        self._in_memory_cache.clear()
+                        self._prefix_index.clear()
         except Exception as e:
-            logger.error(f"Cache clear error: {e}")
+            logger.error("Cache clear error: %s", e)
 
 # Global cache instance
 cache_manager = CacheManager()
\ No newline at end of file
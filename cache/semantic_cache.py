@@ -0,0 +1,156 @@
+import re
+import threading
+from typing import Any, Dict, Hashable, List, Optional, Tuple
+import numpy as np
+from cache.cache_manager import cache_manager
+from config.settings import settings
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Words that change what a financial question asks for. Embeddings barely
+# tell "NVDA price" from "NVDA price target", so queries only share an
+# answer when they mention the same details (English and French synonyms
+# map to one name)
+_DETAIL_TERMS = {
+    "target": r"target|objectif",
+    "forecast": r"forecast|outlook|prévision|perspective",
+    "dividend": r"dividend",
+    "earnings": r"earnings|eps|résultats|bénéfice",
+    "revenue": r"revenue|sales|chiffre d'affaires",
+    "valuation": r"p/?e\b|ratio|valuation|valorisation",
+    "market_cap": r"market cap|capitalisation",
+    "volume": r"volume",
+    "analysts": r"analyst|recommend|recommandation|rating",
+    "fundamentals": r"fundamental|fondamenta",
+    "margin": r"margin|marge",
+    "debt": r"debt|dette",
+    "growth": r"growth|croissance",
+    "range": r"52|range|high|low|plus haut|plus bas",
+    "history": r"history|historique|chart|graphique",
+    "news": r"news|actualité|nouvelles",
+    "compare": r"compar|vs\b|versus",
+}
+_DETAIL_RE = re.compile(
+    "|".join(f"(?P<{name}>\\b(?:{pattern}))" for name, pattern in _DETAIL_TERMS.items()),
+    re.IGNORECASE
+)
+
+
+def semantic_scope(query: str, *context: Hashable) -> Hashable:
+    """Scope for SemanticCache: the given context (ticker, route, ...) plus the query's details"""
+    return (*context, frozenset(m.lastgroup for m in _DETAIL_RE.finditer(query)))
+
+
+class SemanticCache:
+    """Embedding index that maps paraphrased queries to existing cache keys.
+
+    Responses stay in cache_manager (and expire with its TTL); this class
+    only remembers one normalized embedding per cached key. A new query
+    reuses a response when its cosine similarity with a stored embedding
+    reaches the threshold. Entries are grouped by an optional scope (see
+    semantic_scope) so "AAPL price" can never hit a cached "MSFT price",
+    nor a cached "AAPL price target".
+    """
+
+    def __init__(
+        self,
+        model_name: Optional[str] = None,
+        threshold: Optional[float] = None,
+        max_entries: int = 1000
+    ):
+        self.model_name = model_name or settings.SEMANTIC_CACHE_MODEL
+        self.threshold = threshold if threshold is not None else settings.SEMANTIC_CACHE_THRESHOLD
+        self.max_entries = max_entries
+        self.enabled = settings.SEMANTIC_CACHE_ENABLED
+        self._model = None
+        self._entries: Dict[Hashable, Tuple[np.ndarray, List[str]]] = {}
+        self._lock = threading.Lock()
+        # Separate lock so a slow model load never blocks get/add
+        self._model_lock = threading.Lock()
+
+    def _load_model(self):
+        """Load the embedding model on first use, disabling the cache on failure"""
+        if self._model is None:
+            with self._model_lock:
+                if self._model is None and self.enabled:
+                    try:
+                        from sentence_transformers import SentenceTransformer
+                        self._model = SentenceTransformer(self.model_name)
+                        logger.info(f"✅ Loaded semantic cache model {self.model_name}")
+                    except Exception as e:
+                        logger.warning(f"⚠️  Semantic cache disabled: {e}")
+                        self.enabled = False
+        return self._model
+
+    def embed(self, query: str) -> Optional[np.ndarray]:
+        """Return the normalized query embedding, or None if disabled"""
+        if not self.enabled:
+            return None
+        try:
+            # Only loading is serialized; encode calls run concurrently
+            model = self._load_model()
+            if model is None:
+                return None
+            return model.encode(query, normalize_embeddings=True)
+        except Exception as e:
+            logger.error(f"Semantic cache embed error: {e}")
+            return None
+
+    def get(self, embedding: Optional[np.ndarray], scope: Hashable = None) -> Optional[Any]:
+        """Get the cached value of the most similar stored query"""
+        if embedding is None:
+            return None
+
+        with self._lock:
+            entry = self._entries.get(scope)
+            if entry is None:
+                return None
+            matrix, keys = entry
+            scores = matrix @ embedding
+            best = int(np.argmax(scores))
+            if scores[best] < self.threshold:
+                return None
+            key = keys[best]
+
+        cached = cache_manager.get(key)
+        if cached is None:
+            # Value expired or was cleared - forget the embedding too
+            self._remove(scope, key)
+        return cached
+
+    def add(self, key: str, embedding: Optional[np.ndarray], scope: Hashable = None):
+        """Index a cache key under the embedding of the query that produced it"""
+        if embedding is None:
+            return
+
+        with self._lock:
+            matrix, keys = self._entries.get(scope, (None, []))
+            if key in keys:
+                return
+            row = embedding[np.newaxis, :]
+            matrix = row if matrix is None else np.vstack((matrix, row))
+            keys = keys + [key]
+            if len(keys) > self.max_entries:
+                matrix, keys = matrix[1:], keys[1:]
+            self._entries[scope] = (matrix, keys)
+
+    def _remove(self, scope: Hashable, key: str):
+        with self._lock:
+            entry = self._entries.get(scope)
+            if entry is None or key not in entry[1]:
+                return
+            matrix, keys = entry
+            i = keys.index(key)
+            if len(keys) == 1:
+                del self._entries[scope]
+            else:
+                self._entries[scope] = (np.delete(matrix, i, axis=0), keys[:i] + keys[i + 1:])
+
+    def clear(self):
+        """Forget all indexed queries"""
+        with self._lock:
+            self._entries.clear()
+
+# Global semantic cache instance
+semantic_cache = SemanticCache()
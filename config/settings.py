@@ -21,11 +21,34 @@ class Settings(BaseSettings):
     
     # Cache Configuration
     CACHE_TTL: int = int(os.getenv("CACHE_TTL", "3600"))
+    MEMORY_CACHE_MAX_ENTRIES: int = int(os.getenv("MEMORY_CACHE_MAX_ENTRIES", "10000"))  # In-memory fallback LRU size
+    DISK_CACHE_DIR: str = os.getenv("DISK_CACHE_DIR", "")  # Without Redis, persist the cache here (needs diskcache)
     NEWS_CACHE_TTL: int = int(os.getenv("NEWS_CACHE_TTL", "300"))
+    STOCK_CACHE_TTL: int = int(os.getenv("STOCK_CACHE_TTL", "30"))  # Prices move fast
+    ANALYST_CACHE_TTL: int = int(os.getenv("ANALYST_CACHE_TTL", "3600"))
+    FUNDAMENTALS_CACHE_TTL: int = int(os.getenv("FUNDAMENTALS_CACHE_TTL", "3600"))
+    CHART_CACHE_TTL: int = int(os.getenv("CHART_CACHE_TTL", "300"))  # Intraday charts; also client max-age
+    CHART_HISTORY_CACHE_TTL: int = int(os.getenv("CHART_HISTORY_CACHE_TTL", "86400"))  # Charts of 1mo and longer
+    
+    # Semantic Cache Configuration (paraphrased queries)
+    SEMANTIC_CACHE_ENABLED: bool = os.getenv("SEMANTIC_CACHE_ENABLED", "false").lower() == "true"  # Needs the "semantic" extra
+    SEMANTIC_CACHE_MODEL: str = os.getenv("SEMANTIC_CACHE_MODEL", "sentence-transformers/all-MiniLM-L6-v2")
+    SEMANTIC_CACHE_THRESHOLD: float = float(os.getenv("SEMANTIC_CACHE_THRESHOLD", "0.9"))
     
     # Agent Configuration
     MAX_RETRIES: int = int(os.getenv("MAX_RETRIES", "3"))
     REQUEST_TIMEOUT: int = int(os.getenv("REQUEST_TIMEOUT", "30"))
+    FETCH_TIMEOUT: float = float(os.getenv("FETCH_TIMEOUT", "5.0"))  # Per data-fetch deadline (seconds)
+    AGENT_MAX_WORKERS: int = int(os.getenv("AGENT_MAX_WORKERS", "8"))
+    THREAD_POOL_SIZE: int = int(os.getenv("THREAD_POOL_SIZE", "64"))  # Default executor for blocking I/O
+    YFINANCE_CONCURRENCY: int = int(os.getenv("YFINANCE_CONCURRENCY", "32"))  # Max in-flight yfinance calls
+    WARMUP: bool = os.getenv("WARMUP", "false").lower() == "true"  # Build agents at API startup
+    DEBUG: bool = os.getenv("DEBUG", "false").lower() == "true"  # Print agent reasoning steps
+    ENABLE_LLM_FORMATTING: bool = os.getenv("ENABLE_LLM_FORMATTING", "false").lower() == "true"  # Allow SimpleFinancialAgent.llm
+    
+    # Server Configuration (python app.py / python -m api.server)
+    WORKERS: int = int(os.getenv("WORKERS", "1"))
+    RELOAD: bool = os.getenv("RELOAD", "false").lower() == "true"  # Dev only; forces a single worker
     
     # Search Configuration
     MAX_SEARCH_RESULTS: int = int(os.getenv("MAX_SEARCH_RESULTS", "5"))
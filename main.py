@@ -30,8 +30,8 @@ Example Session:
 """
 import asyncio
 import logging
+import time
 from typing import Dict, Any
-from datetime import datetime
 from agents.orchestrator import MultiAgentOrchestrator
 
 # Setup logging
@@ -86,9 +86,9 @@ class FinancialAssistant:
             print(f"\n📊 Processing query {self.query_count}: {question}")
             print("-" * 60)
             
-            start_time = datetime.now()
+            start_time = time.perf_counter()
             response = await self.orchestrator.query(question)
-            response_time = (datetime.now() - start_time).total_seconds()
+            response_time = time.perf_counter() - start_time
             
             print(f"\n✅ Response (took {response_time:.2f}s):")
             print("-" * 60)
@@ -1,77 +1,135 @@
-from typing import List, Dict, Any
-from datetime import datetime
+import itertools
+import re
+import sys
+import time
+from collections import Counter, OrderedDict, defaultdict, deque
+from dataclasses import dataclass, field
+from typing import List, Dict, Any, Set
 import logging
 
 logger = logging.getLogger(__name__)
 
+# Recent get_context results kept per manager (retries re-ask the same query)
+CONTEXT_CACHE_SIZE = 32
+
+# Word tokens for relevance matching; punctuation is dropped so "stock?" matches "stock"
+_WORD_RE = re.compile(r"\w+")
+
+def _tokenize(text: str) -> frozenset:
+    """Case-folded set of words in text.
+    
+    Words are interned: common ones ("stock", "price") are then a single
+    object shared by every token set and index key, and compare by identity.
+    """
+    return frozenset(map(sys.intern, _WORD_RE.findall(text.casefold())))
+
+@dataclass(slots=True)
+class Interaction:
+    """One stored user/assistant exchange"""
+    timestamp_ns: int  # epoch ns; format only if ever displayed
+    user: str
+    assistant: str
+    tokens: frozenset  # case-folded words of user + assistant
+    metadata: Dict[str, Any] = field(default_factory=dict)
+
 class MemoryManager:
     """Simple conversation memory manager without vector embeddings"""
     
     def __init__(self, max_history: int = 10):
-        self.memory = []
+        # Bounded window: appending past max_history drops the oldest entry
+        self.memory: deque = deque(maxlen=max_history)
+        # Inverted index: word -> ids of the stored interactions containing it.
+        # Ids are sequential, so self.memory holds ids [_next_id - len, _next_id)
+        self._index: Dict[str, Set[int]] = defaultdict(set)
+        self._next_id = 0
+        # query -> rendered context, LRU; emptied whenever memory changes
+        self._context_cache: "OrderedDict[str, str]" = OrderedDict()
         self.max_history = max_history
     
     def add_interaction(self, user_input: str, agent_response: str, metadata: Dict = None):
         """Add interaction to memory"""
-        try:
-            interaction = {
-                "timestamp": datetime.now().isoformat(),
-                "user": user_input,
-                "assistant": agent_response,
-                "metadata": metadata or {}
-            }
-            
-            self.memory.append(interaction)
-            
-            # Keep only recent history
-            if len(self.memory) > self.max_history:
-                self.memory = self.memory[-self.max_history:]
-                
-        except Exception as e:
-            logger.error(f"Memory add error: {e}")
+        interaction = Interaction(
+            time.time_ns(),
+            user_input,
+            agent_response,
+            _tokenize(f"{user_input} {agent_response}"),
+            metadata or {}
+        )
+        
+        if self.memory and len(self.memory) == self.max_history:
+            self._unindex_oldest()
+        
+        self.memory.append(interaction)
+        for token in interaction.tokens:
+            self._index[token].add(self._next_id)
+        self._next_id += 1
+        self._context_cache.clear()
+    
+    def _unindex_oldest(self):
+        """Drop the index entries of the interaction about to be evicted"""
+        oldest_id = self._next_id - len(self.memory)
+        for token in self.memory[0].tokens:
+            ids = self._index[token]
+            ids.discard(oldest_id)
+            if not ids:
+                del self._index[token]
     
     def get_conversation_history(self, limit: int = None) -> List[str]:
         """Get formatted conversation history"""
-        try:
-            history = []
-            for item in self.memory[-(limit or self.max_history):]:
-                history.append(f"User: {item['user']}")
-                history.append(f"Assistant: {item['assistant']}")
-            return history
-        except Exception as e:
-            logger.error(f"Memory get error: {e}")
-            return []
+        history = []
+        start = max(0, len(self.memory) - (limit or self.max_history))
+        for item in itertools.islice(self.memory, start, None):
+            history.append(f"User: {item.user}")
+            history.append(f"Assistant: {item.assistant}")
+        return history
+    
+    def get_conversation_text(self, limit: int = None) -> str:
+        """Get conversation history as a single newline-separated string"""
+        start = max(0, len(self.memory) - (limit or self.max_history))
+        return "\n".join(
+            f"User: {item.user}\nAssistant: {item.assistant}"
+            for item in itertools.islice(self.memory, start, None)
+        )
     
     def get_context(self, current_query: str) -> str:
         """Get relevant context from memory"""
-        try:
-            # Simple keyword matching for relevance
-            query_words = set(current_query.lower().split())
-            relevant_interactions = []
-            
-            for item in self.memory[-5:]:  # Check last 5 interactions
-                combined_text = f"{item['user']} {item['assistant']}".lower()
-                # Count matching words
-                matches = sum(1 for word in query_words if word in combined_text)
-                if matches > 1:  # At least 2 matching words
-                    relevant_interactions.append(item)
-            
-            # Format relevant context
-            if relevant_interactions:
-                context_lines = ["Previous relevant conversations:"]
-                for item in relevant_interactions[-3:]:  # Last 3 relevant
-                    context_lines.append(f"User: {item['user']}")
-                    context_lines.append(f"Assistant: {item['assistant']}")
-                return "\n".join(context_lines)
-            return "No relevant previous conversations."
-            
-        except Exception as e:
-            logger.error(f"Memory context error: {e}")
-            return ""
+        cached = self._context_cache.get(current_query)
+        if cached is not None:
+            self._context_cache.move_to_end(current_query)
+            return cached
+        
+        # Simple keyword matching for relevance
+        query_words = _tokenize(current_query)
+        
+        # Count matching words per interaction via the index, restricted to
+        # the last 5 interactions; keep those with at least 2 matches
+        first_id = self._next_id - len(self.memory)
+        recent_id = max(first_id, self._next_id - 5)
+        matches = Counter(
+            i for word in query_words
+            for i in self._index.get(word, ())
+            if i >= recent_id
+        )
+        relevant_interactions = [
+            self.memory[i - first_id] for i in sorted(matches) if matches[i] > 1
+        ]
+        
+        # Format relevant context
+        if relevant_interactions:
+            context = "Previous relevant conversations:\n" + "\n".join(
+                f"User: {item.user}\nAssistant: {item.assistant}"
+                for item in relevant_interactions[-3:]  # Last 3 relevant
+            )
+        else:
+            context = "No relevant previous conversations."
+        
+        self._context_cache[current_query] = context
+        if len(self._context_cache) > CONTEXT_CACHE_SIZE:
+            self._context_cache.popitem(last=False)
+        return context
     
     def clear(self):
         """Clear memory"""
-        try:
-            self.memory.clear()
-        except Exception as e:
-            logger.error(f"Memory clear error: {e}")
\ No newline at end of file
+        self.memory.clear()
+        self._index.clear()
+        self._context_cache.clear()
@@ -23,17 +23,21 @@ TESTS = [
 
 
 async def run_tests():
-    for i, query in enumerate(TESTS, 1):
+    # Queries wait on the network, so run them all at once and print in order
+    responses = await asyncio.gather(
+        *(orchestrator.query(query) for query in TESTS), return_exceptions=True
+    )
+
+    for i, (query, response) in enumerate(zip(TESTS, responses), 1):
         print("\n" + "-"*80)
         print(f"🚀 Test {i}: {query}")
         print("-"*80)
 
-        try:
-            response = await orchestrator.query(query)
+        if isinstance(response, Exception):
+            print(f"❌ ERROR during test {i}: {response}")
+        else:
             print("\n📌 RESPONSE:")
             print(response)
-        except Exception as e:
-            print(f"❌ ERROR during test {i}: {e}")
 
 
 if __name__ == "__main__":
@@ -16,6 +16,27 @@ def event_loop():
     yield loop
     loop.close()
 
+@pytest.fixture(scope="session")
+def api_client():
+    """One TestClient for the whole session; the app lifespan runs once"""
+    from fastapi.testclient import TestClient
+    from api.server import app
+    
+    with TestClient(app) as client:
+        yield client
+
+@pytest.fixture(scope="session")
+def agent():
+    """One SimpleFinancialAgent for the whole session (it keeps no per-query state)"""
+    from agents.simple_financial_agent import SimpleFinancialAgent
+    return SimpleFinancialAgent()
+
+@pytest.fixture(scope="session")
+def web_tools():
+    """One WebSearchTools for the whole session; patch its ddgs client per test"""
+    from tools.web_search_tools import WebSearchTools
+    return WebSearchTools()
+
 @pytest.fixture
 def sample_ticker():
     """Sample ticker for testing"""
@@ -79,6 +100,61 @@ def mock_news():
         }
     ]
 
+@pytest.fixture
+def yf_ticker_mock(mock_stock_data, mock_fundamentals, mock_ohlcv_flat):
+    """Patch yfinance.Ticker; every ticker gets info and history from the mock fixtures.
+    
+    Tests can override attributes on mock.return_value (info, news, ...).
+    The process-wide quote summary cache is cleared around each test so
+    mocked info never leaks into another test using the same symbol.
+    """
+    from unittest.mock import patch
+    from cache.cache_manager import cache_manager
+    
+    info = {
+        'currentPrice': mock_stock_data['current_price'],
+        'currency': mock_stock_data['currency'],
+        'dayLow': mock_stock_data['low'],
+        'dayHigh': mock_stock_data['high'],
+        'volume': mock_stock_data['volume'],
+        'marketCap': mock_stock_data['market_cap'],
+        'trailingPE': mock_stock_data['pe_ratio'],
+        'fiftyTwoWeekLow': mock_stock_data['52_week_low'],
+        'fiftyTwoWeekHigh': mock_stock_data['52_week_high'],
+        'profitMargins': mock_fundamentals['profit_margins'],
+        'revenueGrowth': mock_fundamentals['revenue_growth'],
+        'returnOnEquity': mock_fundamentals['return_on_equity'],
+        'debtToEquity': mock_fundamentals['debt_to_equity']
+    }
+    
+    cache_manager.clear("ticker_info")
+    with patch('yfinance.Ticker') as mock_ticker:
+        mock_ticker.return_value.info = info
+        mock_ticker.return_value.history.return_value = mock_ohlcv_flat
+        yield mock_ticker
+    cache_manager.clear("ticker_info")
+
+@pytest.fixture
+def financial_tools_mock():
+    """Patch the four FinancialTools fetchers the agent calls, in one go.
+    
+    Yields a dict of mocks keyed by method name (stock data, analysts,
+    fundamentals return empty dicts, news an empty list); tests set the
+    return values they care about.
+    """
+    from unittest.mock import DEFAULT, patch
+    
+    with patch.multiple(
+        'tools.financial_tools.FinancialTools',
+        get_stock_data=DEFAULT,
+        get_analyst_recommendations=DEFAULT,
+        get_fundamentals=DEFAULT,
+        get_company_news=DEFAULT
+    ) as mocks:
+        for name, mock in mocks.items():
+            mock.return_value = [] if name == 'get_company_news' else {}
+        yield mocks
+
 @pytest.fixture
 def mock_web_search_results():
     """Mock web search results"""
@@ -97,12 +173,35 @@ def mock_web_search_results():
         }
     ]
 
-@pytest.fixture(autouse=True)
-def clean_charts_dir():
-    """Clean up charts directory after tests"""
-    yield
-    # Cleanup code here if needed
-    import shutil
-    chart_dir = "charts/test_charts"
-    if os.path.exists(chart_dir):
-        shutil.rmtree(chart_dir)
+@pytest.fixture(scope="session")
+def mock_ohlcv_100():
+    """100 days of steadily rising OHLCV history, built once per session.
+    
+    Shared across tests: treat as read-only (copy before mutating).
+    """
+    import pandas as pd
+    from datetime import datetime
+    
+    dates = pd.date_range(end=datetime.now(), periods=100, freq='D')
+    return pd.DataFrame({
+        'Open': [100 + i for i in range(100)],
+        'Close': [101 + i for i in range(100)],
+        'High': [102 + i for i in range(100)],
+        'Low': [99 + i for i in range(100)],
+        'Volume': [1000000 + i*10000 for i in range(100)]
+    }, index=dates)
+
+@pytest.fixture(scope="session")
+def mock_ohlcv_flat():
+    """50 days of flat OHLCV history, built once per session (read-only)"""
+    import pandas as pd
+    from datetime import datetime
+    
+    dates = pd.date_range(end=datetime.now(), periods=50, freq='D')
+    return pd.DataFrame({
+        'Open': [100] * 50,
+        'Close': [101] * 50,
+        'High': [102] * 50,
+        'Low': [99] * 50,
+        'Volume': [1000000] * 50
+    }, index=dates)
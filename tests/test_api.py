@@ -2,8 +2,7 @@
 API endpoint tests
 """
 import pytest
-from fastapi.testclient import TestClient
-from api.server import app
+from unittest.mock import AsyncMock, Mock, patch
 
 pytestmark = pytest.mark.api
 
@@ -11,41 +10,55 @@ pytestmark = pytest.mark.api
 class TestAPIEndpoints:
     """Test suite for API endpoints"""
     
-    def setup_method(self):
-        """Setup test client"""
-        self.client = TestClient(app)
-    
-    def test_root_endpoint(self):
+    def test_root_endpoint(self, api_client):
         """Test root endpoint"""
-        response = self.client.get("/")
+        from api.server import InfoResponse
+        
+        response = api_client.get("/")
         
         assert response.status_code == 200
         data = response.json()
         assert 'message' in data
         assert 'version' in data
+        InfoResponse.model_validate(data)
     
-    def test_health_endpoint(self):
+    def test_health_endpoint(self, api_client):
         """Test health check endpoint"""
-        response = self.client.get("/health")
+        from api.server import HealthResponse
+        
+        response = api_client.get("/health")
         
         assert response.status_code == 200
         data = response.json()
         assert data['status'] == 'healthy'
         assert 'service' in data
+        HealthResponse.model_validate(data)
     
-    def test_status_endpoint(self):
+    def test_status_endpoint(self, api_client):
         """Test status endpoint"""
-        response = self.client.get("/status")
+        from api.server import StatusResponse
+        
+        response = api_client.get("/status")
         
         assert response.status_code == 200
         data = response.json()
         assert 'service' in data
         assert 'agents' in data
+        StatusResponse.model_validate(data)
+    
+    def test_status_etag_is_weak(self, api_client):
+        """Test that /status uses a weak ETag (its timestamp changes) and honors it"""
+        first = api_client.get("/status")
+        second = api_client.get("/status", headers={"If-None-Match": first.headers["etag"]})
+        
+        assert first.headers["etag"].startswith('W/"')
+        assert second.status_code == 304
+        assert second.content == b""
     
     @pytest.mark.slow
-    def test_query_endpoint_valid(self):
+    def test_query_endpoint_valid(self, api_client):
         """Test query endpoint with valid request"""
-        response = self.client.post(
+        response = api_client.post(
             "/query",
             json={"query": "What is AAPL stock price?"}
         )
@@ -57,19 +70,35 @@ class TestAPIEndpoints:
         assert 'response_time' in data
         assert data['success'] is True
     
-    def test_query_endpoint_invalid(self):
+    def test_query_endpoint_invalid(self, api_client):
         """Test query endpoint with invalid request"""
-        response = self.client.post(
+        response = api_client.post(
             "/query",
             json={"query": ""}  # Empty query
         )
         
         assert response.status_code == 422  # Validation error
     
+    def test_query_stream_endpoint(self, api_client):
+        """Test that /query/stream sends chunks as SSE events"""
+        async def fake_stream(query):
+            for chunk in ["NVDA is ", "up today"]:
+                yield chunk
+        
+        orchestrator = Mock()
+        orchestrator.query_stream = fake_stream
+        with patch('api.server.get_orchestrator', return_value=orchestrator):
+            response = api_client.post("/query/stream", json={"query": "NVDA news"})
+        
+        assert response.status_code == 200
+        assert response.headers['content-type'].startswith('text/event-stream')
+        assert 'data: {"delta":"NVDA is "}' in response.text
+        assert response.text.endswith('event: done\ndata: {}\n\n')
+    
     @pytest.mark.slow
-    def test_stocks_endpoint(self):
+    def test_stocks_endpoint(self, api_client):
         """Test get stock data endpoint"""
-        response = self.client.get("/stocks/AAPL")
+        response = api_client.get("/stocks/AAPL")
         
         assert response.status_code == 200
         data = response.json()
@@ -77,10 +106,21 @@ class TestAPIEndpoints:
         assert data['ticker'] == 'AAPL'
         assert 'data' in data
     
+    def test_stocks_endpoint_not_modified(self, api_client):
+        """Test that unchanged stock data is answered with a 304"""
+        with patch('agents.simple_financial_agent.SimpleFinancialAgent.query',
+                   new=AsyncMock(return_value="## 📈 Stock Data for AAPL")):
+            first = api_client.get("/stocks/AAPL")
+            second = api_client.get("/stocks/AAPL", headers={"If-None-Match": first.headers["etag"]})
+        
+        assert first.status_code == 200
+        assert "max-age" in first.headers["cache-control"]
+        assert second.status_code == 304
+    
     @pytest.mark.slow
-    def test_compare_stocks_endpoint(self):
+    def test_compare_stocks_endpoint(self, api_client):
         """Test compare stocks endpoint"""
-        response = self.client.post(
+        response = api_client.post(
             "/compare-stocks",
             json=["AAPL", "MSFT"]
         )
@@ -91,18 +131,18 @@ class TestAPIEndpoints:
         assert 'comparison' in data
         assert data['success'] is True
     
-    def test_compare_stocks_too_few(self):
+    def test_compare_stocks_too_few(self, api_client):
         """Test compare stocks with insufficient tickers"""
-        response = self.client.post(
+        response = api_client.post(
             "/compare-stocks",
             json=["AAPL"]
         )
         
         assert response.status_code == 400
     
-    def test_compare_stocks_too_many(self):
+    def test_compare_stocks_too_many(self, api_client):
         """Test compare stocks with too many tickers"""
-        response = self.client.post(
+        response = api_client.post(
             "/compare-stocks",
             json=["AAPL", "MSFT", "GOOGL", "AMZN", "META", "TSLA"]
         )
@@ -110,42 +150,67 @@ class TestAPIEndpoints:
         assert response.status_code == 400
     
     @pytest.mark.slow
-    def test_chart_endpoint(self):
+    def test_chart_endpoint(self, api_client):
         """Test chart generation endpoint"""
-        response = self.client.get("/chart/AAPL?period=1mo")
+        response = api_client.get("/chart/AAPL?period=1mo")
         
         # Should return image or error
         assert response.status_code in [200, 500]
         if response.status_code == 200:
             assert response.headers['content-type'] == 'image/png'
     
-    def test_clear_cache_endpoint(self):
+    def test_chart_endpoint_not_modified(self, api_client, tmp_path):
+        """Test that a matching If-None-Match gets a 304 without the PNG body"""
+        chart_path = tmp_path / "AAPL_1mo.png"
+        chart_path.write_bytes(b"\x89PNG fake")
+        
+        with patch('tools.chart_tools.ChartTools.plot_stock_history', return_value=str(chart_path)):
+            first = api_client.get("/chart/AAPL?period=1mo")
+            second = api_client.get(
+                "/chart/AAPL?period=1mo",
+                headers={"If-None-Match": first.headers["etag"]}
+            )
+        
+        assert first.status_code == 200
+        assert "max-age" in first.headers["cache-control"]
+        assert second.status_code == 304
+        assert second.content == b""
+    
+    def test_clear_cache_endpoint(self, api_client):
         """Test cache clear endpoint"""
-        response = self.client.post("/clear-cache")
+        response = api_client.post("/clear-cache")
         
         assert response.status_code == 200
         data = response.json()
         assert data['success'] is True
     
-    def test_cors_headers(self):
+    def test_cors_headers(self, api_client):
         """Test CORS headers are present"""
-        response = self.client.get("/health")
+        response = api_client.get("/health")
         
         # Check CORS headers
         assert 'access-control-allow-origin' in response.headers
     
-    def test_docs_endpoint(self):
+    def test_docs_endpoint(self, api_client):
         """Test OpenAPI docs endpoint"""
-        response = self.client.get("/docs")
+        response = api_client.get("/docs")
         
         assert response.status_code == 200
     
-    def test_openapi_json(self):
+    def test_openapi_json(self, api_client):
         """Test OpenAPI JSON schema"""
-        response = self.client.get("/openapi.json")
+        response = api_client.get("/openapi.json")
         
         assert response.status_code == 200
         data = response.json()
         assert 'openapi' in data
         assert 'info' in data
         assert 'paths' in data
+    
+    def test_openapi_documents_prebuilt_responses(self, api_client):
+        """Test that pre-serialized endpoints still document their models"""
+        paths = api_client.get("/openapi.json").json()['paths']
+        
+        for path, model in (("/", "InfoResponse"), ("/health", "HealthResponse"), ("/status", "StatusResponse")):
+            schema = paths[path]['get']['responses']['200']['content']['application/json']['schema']
+            assert schema['$ref'].endswith(f"/{model}")
@@ -0,0 +1,53 @@
+"""
+Unit tests for cache_manager module
+"""
+import asyncio
+import pytest
+from cache.cache_manager import cache_manager
+
+pytestmark = pytest.mark.unit
+
+
+class TestGetOrCompute:
+    """Test suite for CacheManager.get_or_compute single-flight"""
+
+    @pytest.mark.asyncio
+    async def test_waiters_share_one_computation(self):
+        """Test that concurrent callers for one key run the factory once"""
+        calls = 0
+
+        async def compute():
+            nonlocal calls
+            calls += 1
+            await asyncio.sleep(0.01)
+            return "value"
+
+        results = await asyncio.gather(
+            *(cache_manager.get_or_compute("test_goc:shared", compute) for _ in range(5))
+        )
+
+        assert results == ["value"] * 5
+        assert calls == 1
+
+    @pytest.mark.asyncio
+    async def test_leader_cancelled_waiter_recomputes(self):
+        """Test that cancelling the leader does not cancel its waiters"""
+        started = asyncio.Event()
+
+        async def hang():
+            started.set()
+            await asyncio.sleep(10)
+
+        async def compute():
+            return "value"
+
+        leader = asyncio.create_task(cache_manager.get_or_compute("test_goc:cancel", hang))
+        await started.wait()
+        waiter = asyncio.create_task(cache_manager.get_or_compute("test_goc:cancel", compute))
+        await asyncio.sleep(0)  # Let the waiter join the in-flight computation
+
+        leader.cancel()
+
+        assert await waiter == "value"
+        with pytest.raises(asyncio.CancelledError):
+            await leader
@@ -5,42 +5,32 @@ import pytest
 from unittest.mock import Mock, patch, MagicMock
 from tools.chart_tools import ChartTools, plot_stock, plot_comparison
 import os
-import tempfile
 
 pytestmark = pytest.mark.unit
 
 
+def _download(hist, scale=lambda: 1):
+    """yf.download stand-in: hist (times scale()) for every ticker, (field, ticker) columns"""
+    import pandas as pd
+    
+    def download(tickers, **kwargs):
+        return pd.concat({t: hist * scale() for t in tickers}, axis=1).swaplevel(axis=1)
+    return download
+
+
 class TestChartTools:
     """Test suite for ChartTools class"""
     
-    def setup_method(self):
-        """Setup test instance with temp directory"""
-        self.test_dir = tempfile.mkdtemp()
+    @pytest.fixture(autouse=True)
+    def setup(self, tmp_path):
+        """Setup test instance with a per-test chart directory (safe under pytest -n)"""
+        self.test_dir = str(tmp_path)
         self.chart_tools = ChartTools(chart_dir=self.test_dir)
     
-    def teardown_method(self):
-        """Cleanup test charts"""
-        import shutil
-        if os.path.exists(self.test_dir):
-            shutil.rmtree(self.test_dir)
-    
     @patch('yfinance.Ticker')
-    def test_plot_stock_history_success(self, mock_ticker):
+    def test_plot_stock_history_success(self, mock_ticker, mock_ohlcv_100):
         """Test successful stock chart generation"""
-        # Setup mock data
-        import pandas as pd
-        from datetime import datetime, timedelta
-        
-        dates = pd.date_range(end=datetime.now(), periods=100, freq='D')
-        mock_hist = pd.DataFrame({
-            'Open': [100 + i for i in range(100)],
-            'Close': [101 + i for i in range(100)],
-            'High': [102 + i for i in range(100)],
-            'Low': [99 + i for i in range(100)],
-            'Volume': [1000000 + i*10000 for i in range(100)]
-        }, index=dates)
-        
-        mock_ticker.return_value.history.return_value = mock_hist
+        mock_ticker.return_value.history.return_value = mock_ohlcv_100
         
         # Execute
         chart_path = self.chart_tools.plot_stock_history(
@@ -56,21 +46,9 @@ class TestChartTools:
         assert 'AAPL' in chart_path
     
     @patch('yfinance.Ticker')
-    def test_plot_stock_history_no_volume(self, mock_ticker):
+    def test_plot_stock_history_no_volume(self, mock_ticker, mock_ohlcv_flat):
         """Test chart generation without volume"""
-        import pandas as pd
-        from datetime import datetime
-        
-        dates = pd.date_range(end=datetime.now(), periods=50, freq='D')
-        mock_hist = pd.DataFrame({
-            'Open': [100] * 50,
-            'Close': [101] * 50,
-            'High': [102] * 50,
-            'Low': [99] * 50,
-            'Volume': [1000000] * 50
-        }, index=dates)
-        
-        mock_ticker.return_value.history.return_value = mock_hist
+        mock_ticker.return_value.history.return_value = mock_ohlcv_flat
         
         # Execute
         chart_path = self.chart_tools.plot_stock_history(
@@ -95,27 +73,13 @@ class TestChartTools:
         with pytest.raises(ValueError, match="No data available"):
             self.chart_tools.plot_stock_history("INVALID")
     
-    @patch('yfinance.Ticker')
-    def test_plot_comparison_chart_success(self, mock_ticker):
+    @patch('yfinance.download')
+    def test_plot_comparison_chart_success(self, mock_download, mock_ohlcv_100):
         """Test successful comparison chart generation"""
-        import pandas as pd
-        from datetime import datetime
-        
-        dates = pd.date_range(end=datetime.now(), periods=100, freq='D')
+        import random
         
         # Mock different data for each ticker
-        def mock_history(period):
-            import random
-            base = random.randint(50, 200)
-            return pd.DataFrame({
-                'Open': [base + i for i in range(100)],
-                'Close': [base + i + 1 for i in range(100)],
-                'High': [base + i + 2 for i in range(100)],
-                'Low': [base + i - 1 for i in range(100)],
-                'Volume': [1000000] * 100
-            }, index=dates)
-        
-        mock_ticker.return_value.history = mock_history
+        mock_download.side_effect = _download(mock_ohlcv_100, lambda: random.uniform(0.5, 2))
         
         # Execute
         chart_path = self.chart_tools.plot_comparison_chart(
@@ -128,18 +92,10 @@ class TestChartTools:
         assert os.path.exists(chart_path)
         assert 'comparison' in chart_path
     
-    @patch('yfinance.Ticker')
-    def test_plot_comparison_chart_normalized(self, mock_ticker):
+    @patch('yfinance.download')
+    def test_plot_comparison_chart_normalized(self, mock_download, mock_ohlcv_100):
         """Test comparison chart with normalization"""
-        import pandas as pd
-        from datetime import datetime
-        
-        dates = pd.date_range(end=datetime.now(), periods=50, freq='D')
-        mock_hist = pd.DataFrame({
-            'Close': [100 + i*2 for i in range(50)]
-        }, index=dates)
-        
-        mock_ticker.return_value.history.return_value = mock_hist
+        mock_download.side_effect = _download(mock_ohlcv_100)
         
         # Execute
         chart_path = self.chart_tools.plot_comparison_chart(
@@ -151,6 +107,17 @@ class TestChartTools:
         # Assert
         assert os.path.exists(chart_path)
     
+    @patch('yfinance.download')
+    def test_plot_comparison_chart_cached(self, mock_download, mock_ohlcv_100):
+        """Test that the same tickers in another order reuse the rendered chart"""
+        mock_download.side_effect = _download(mock_ohlcv_100)
+        
+        first = self.chart_tools.plot_comparison_chart(["MSFT", "AAPL"], period="1mo")
+        second = self.chart_tools.plot_comparison_chart(["aapl", "msft"], period="1mo")
+        
+        assert first == second
+        mock_download.assert_called_once()
+    
     def test_chart_directory_creation(self):
         """Test that chart directory is created"""
         new_dir = os.path.join(self.test_dir, "new_charts")
@@ -159,21 +126,9 @@ class TestChartTools:
         assert os.path.exists(new_dir)
     
     @patch('yfinance.Ticker')
-    def test_convenience_function_plot_stock(self, mock_ticker):
+    def test_convenience_function_plot_stock(self, mock_ticker, mock_ohlcv_flat):
         """Test convenience function for plotting stock"""
-        import pandas as pd
-        from datetime import datetime
-        
-        dates = pd.date_range(end=datetime.now(), periods=30, freq='D')
-        mock_hist = pd.DataFrame({
-            'Open': [100] * 30,
-            'Close': [101] * 30,
-            'High': [102] * 30,
-            'Low': [99] * 30,
-            'Volume': [1000000] * 30
-        }, index=dates)
-        
-        mock_ticker.return_value.history.return_value = mock_hist
+        mock_ticker.return_value.history.return_value = mock_ohlcv_flat
         
         # Execute
         with patch.object(ChartTools, '__init__', lambda x, chart_dir='charts': setattr(x, 'chart_dir', self.test_dir)):
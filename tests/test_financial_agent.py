@@ -0,0 +1,31 @@
+"""
+Unit tests for the FinancialAgent fast path
+"""
+import pytest
+from agents.financial_agent import _fast_path_ticker
+
+pytestmark = pytest.mark.unit
+
+
+class TestFastPathTicker:
+    """Test suite for "<ticker> price" query detection"""
+
+    def test_known_company_keywords(self):
+        """Test that known keywords map to their ticker"""
+        assert _fast_path_ticker("nvda price") == "NVDA"
+        assert _fast_path_ticker("intel stock price?") == "INTC"
+
+    def test_symbols_typed_as_symbols(self):
+        """Test that uppercase or $-prefixed symbols take the fast path"""
+        assert _fast_path_ticker("IBM price") == "IBM"
+        assert _fast_path_ticker("$ko quote") == "KO"
+        assert _fast_path_ticker("BRK.B stock") == "BRK.B"
+
+    def test_common_words_not_treated_as_tickers(self):
+        """Test that commodity and common-word queries go to the agent"""
+        for query in ("gold price", "oil price", "what price", "Gold price?"):
+            assert _fast_path_ticker(query) is None, f"Failed for query: {query}"
+
+    def test_longer_queries_not_matched(self):
+        """Test that only bare "<ticker> price" queries are matched"""
+        assert _fast_path_ticker("What is the NVDA price target?") is None
@@ -2,8 +2,7 @@
 Unit tests for financial_tools module
 """
 import pytest
-from unittest.mock import Mock, patch, MagicMock
-from tools.financial_tools import FinancialTools
+from tools.financial_tools import FinancialTools, Fundamentals
 import yfinance as yf
 
 pytestmark = pytest.mark.unit
@@ -16,25 +15,8 @@ class TestFinancialTools:
         """Setup test instance"""
         self.financial_tools = FinancialTools()
     
-    @patch('yfinance.Ticker')
-    def test_get_stock_data_success(self, mock_ticker, mock_stock_data):
+    def test_get_stock_data_success(self, yf_ticker_mock, mock_stock_data):
         """Test successful stock data retrieval"""
-        # Setup mock
-        mock_info = MagicMock()
-        mock_info.get.side_effect = lambda key, default=None: {
-            'currentPrice': mock_stock_data['current_price'],
-            'currency': mock_stock_data['currency'],
-            'dayLow': mock_stock_data['low'],
-            'dayHigh': mock_stock_data['high'],
-            'volume': mock_stock_data['volume'],
-            'marketCap': mock_stock_data['market_cap'],
-            'trailingPE': mock_stock_data['pe_ratio'],
-            'fiftyTwoWeekLow': mock_stock_data['52_week_low'],
-            'fiftyTwoWeekHigh': mock_stock_data['52_week_high']
-        }.get(key, default)
-        
-        mock_ticker.return_value.info = mock_info
-        
         # Execute
         result = self.financial_tools.get_stock_data("AAPL")
         
@@ -42,13 +24,14 @@ class TestFinancialTools:
         assert result['current_price'] == mock_stock_data['current_price']
         assert result['currency'] == mock_stock_data['currency']
         assert 'timestamp' in result
-        mock_ticker.assert_called_once_with("AAPL")
+        yf_ticker_mock.assert_called_once_with("AAPL")
     
-    @patch('yfinance.Ticker')
-    def test_get_stock_data_invalid_ticker(self, mock_ticker):
+    def test_get_stock_data_invalid_ticker(self, yf_ticker_mock):
         """Test stock data retrieval with invalid ticker"""
-        # Setup mock to raise exception
-        mock_ticker.return_value.info = {}
+        # Setup mock: unknown tickers have no info and no price history
+        import pandas as pd
+        yf_ticker_mock.return_value.info = {}
+        yf_ticker_mock.return_value.history.return_value = pd.DataFrame()
         
         # Execute
         result = self.financial_tools.get_stock_data("INVALID")
@@ -56,11 +39,10 @@ class TestFinancialTools:
         # Assert - should return error dict
         assert 'error' in result or result.get('current_price') == 'N/A'
     
-    @patch('yfinance.Ticker')
-    def test_get_analyst_recommendations_success(self, mock_ticker, mock_analyst_data):
+    def test_get_analyst_recommendations_success(self, yf_ticker_mock, mock_analyst_data):
         """Test successful analyst recommendations retrieval"""
         # Setup mock
-        mock_ticker.return_value.recommendations_summary = {
+        yf_ticker_mock.return_value.recommendations_summary = {
             'period': ['0m'],
             'strongBuy': [15],
             'buy': [10],
@@ -68,7 +50,7 @@ class TestFinancialTools:
             'sell': [3],
             'strongSell': [2]
         }
-        mock_ticker.return_value.analyst_price_targets = {
+        yf_ticker_mock.return_value.analyst_price_targets = {
             'mean': mock_analyst_data['target_mean'],
             'high': mock_analyst_data['target_high'],
             'low': mock_analyst_data['target_low']
@@ -81,31 +63,28 @@ class TestFinancialTools:
         assert 'recommendation' in result
         assert 'num_analysts' in result or 'target_mean' in result
     
-    @patch('yfinance.Ticker')
-    def test_get_fundamentals_success(self, mock_ticker, mock_fundamentals):
+    def test_get_fundamentals_success(self, yf_ticker_mock):
         """Test successful fundamentals retrieval"""
-        # Setup mock
-        mock_info = MagicMock()
-        mock_info.get.side_effect = lambda key, default=None: {
-            'profitMargins': mock_fundamentals['profit_margins'],
-            'revenueGrowth': mock_fundamentals['revenue_growth'],
-            'returnOnEquity': mock_fundamentals['return_on_equity'],
-            'debtToEquity': mock_fundamentals['debt_to_equity']
-        }.get(key, default)
-        
-        mock_ticker.return_value.info = mock_info
-        
         # Execute
         result = self.financial_tools.get_fundamentals("AAPL")
         
         # Assert
         assert 'profit_margins' in result or 'revenue_growth' in result
     
-    @patch('yfinance.Ticker')
-    def test_get_company_news_success(self, mock_ticker, mock_news):
+    def test_record_from_result_dict(self):
+        """Test that a result dict becomes a record, extra keys ignored"""
+        record = Fundamentals.from_dict({
+            "ticker": "AAPL",
+            "profit_margins": 0.25,
+            "timestamp": "2025-01-01T00:00:00"
+        })
+        
+        assert record == Fundamentals(ticker="AAPL", profit_margins=0.25)
+    
+    def test_get_company_news_success(self, yf_ticker_mock, mock_news):
         """Test successful company news retrieval"""
         # Setup mock
-        mock_ticker.return_value.news = [
+        yf_ticker_mock.return_value.news = [
             {
                 'title': item['title'],
                 'publisher': item['publisher'],
@@ -122,17 +101,13 @@ class TestFinancialTools:
         if len(result) > 0:
             assert 'title' in result[0]
     
-    def test_cache_integration(self, sample_ticker):
+    def test_cache_integration(self, yf_ticker_mock, sample_ticker):
         """Test that caching works for financial tools"""
-        with patch('yfinance.Ticker') as mock_ticker:
-            mock_info = {'currentPrice': 150.0, 'currency': 'USD'}
-            mock_ticker.return_value.info = mock_info
-            
-            # First call
-            result1 = self.financial_tools.get_stock_data(sample_ticker)
-            
-            # Second call should use cache
-            result2 = self.financial_tools.get_stock_data(sample_ticker)
-            
-            # Should have similar results (cache working)
-            assert result1.get('current_price') == result2.get('current_price')
+        # First call
+        result1 = self.financial_tools.get_stock_data(sample_ticker)
+        
+        # Second call should use cache
+        result2 = self.financial_tools.get_stock_data(sample_ticker)
+        
+        # Should have similar results (cache working)
+        assert result1.get('current_price') == result2.get('current_price')
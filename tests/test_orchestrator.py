@@ -0,0 +1,81 @@
+"""
+Unit tests for orchestrator module
+"""
+import pytest
+from unittest.mock import AsyncMock, patch
+from cache.semantic_cache import semantic_cache
+from cache.cache_manager import cache_manager
+
+pytestmark = pytest.mark.unit
+
+
+@pytest.fixture
+def orchestrator():
+    """Orchestrator without a real synthesis endpoint, both data sources stubbed"""
+    from agents.orchestrator import MultiAgentOrchestrator
+
+    with patch('agents.orchestrator.HuggingFaceEndpoint'), patch('agents.orchestrator.ChatHuggingFace'):
+        orchestrator = MultiAgentOrchestrator()
+    orchestrator.financial_agent.query = AsyncMock(return_value="financial data")
+    orchestrator._fetch_web_data = lambda query: "web data"
+    return orchestrator
+
+
+class TestStrictSynthesis:
+    """Test suite for synthesis failures"""
+
+    QUERY = "Latest Tesla news and stock price"
+
+    def teardown_method(self):
+        """Drop the answer a test may have cached"""
+        cache_manager.clear("orchestrator")
+
+    @pytest.mark.asyncio
+    async def test_failure_before_first_token_falls_back(self, orchestrator):
+        """Test that a synthesis failing up front is replaced by the raw data"""
+        async def failing(prompt):
+            raise RuntimeError("endpoint down")
+            yield
+        orchestrator._stream_llm = failing
+
+        result = await orchestrator.query(self.QUERY)
+
+        assert "financial data" in result
+        assert "Error" not in result
+
+    @pytest.mark.asyncio
+    async def test_failure_mid_answer_not_cached(self, orchestrator):
+        """Test that an answer cut off mid-stream is reported and not cached"""
+        async def cut_off(prompt):
+            yield "Tesla rose "
+            raise RuntimeError("stream reset")
+        orchestrator._stream_llm = cut_off
+
+        result = await orchestrator.query(self.QUERY)
+
+        assert result.startswith("Tesla rose ")
+        assert "Error: stream reset" in result
+
+        async def complete(prompt):
+            yield "Tesla rose 3%."
+        orchestrator._stream_llm = complete
+
+        assert await orchestrator.query(self.QUERY) == "Tesla rose 3%."
+
+
+class TestSemanticCacheLookup:
+    """Test suite for the semantic cache step of the pipeline"""
+
+    def teardown_method(self):
+        """Drop the answer a test may have cached"""
+        cache_manager.clear("orchestrator")
+
+    @pytest.mark.asyncio
+    async def test_disabled_cache_skips_embedding(self, orchestrator):
+        """Test that a disabled semantic cache is never asked for an embedding"""
+        with patch.object(semantic_cache, 'enabled', False), \
+             patch.object(semantic_cache, 'embed') as embed:
+            result = await orchestrator.query("AAPL stock price")
+
+        assert "financial data" in result
+        embed.assert_not_called()
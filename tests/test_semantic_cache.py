@@ -0,0 +1,55 @@
+"""
+Unit tests for semantic_cache module
+"""
+import numpy as np
+import pytest
+from cache.cache_manager import cache_manager
+from cache.semantic_cache import SemanticCache, semantic_scope
+
+pytestmark = pytest.mark.unit
+
+
+class TestSemanticCache:
+    """Test suite for SemanticCache scoping"""
+
+    def setup_method(self):
+        """Setup test instance (no model: embeddings are given directly)"""
+        self.cache = SemanticCache(threshold=0.9)
+        self.embedding = np.array([1.0, 0.0, 0.0])
+
+    def test_paraphrases_share_scope(self):
+        """Test that paraphrases of one question land in the same scope"""
+        assert semantic_scope("NVIDIA stock price", "NVDA") == semantic_scope("price of NVDA", "NVDA")
+
+    def test_near_miss_queries_do_not_collide(self):
+        """Test that a different question about the same ticker never hits"""
+        cache_manager.set("test_semantic:price", "NVDA price answer")
+        self.cache.add("test_semantic:price", self.embedding, semantic_scope("NVDA price", "NVDA"))
+
+        # Identical embedding: only the scope keeps these apart
+        for query in ("NVDA price target", "NVDA P/E ratio", "NVDA dividend", "NVDA news"):
+            assert self.cache.get(self.embedding, semantic_scope(query, "NVDA")) is None, f"Failed for query: {query}"
+
+        assert self.cache.get(self.embedding, semantic_scope("price of NVDA", "NVDA")) == "NVDA price answer"
+
+    def test_route_is_part_of_scope(self):
+        """Test that the same words routed differently do not collide"""
+        cache_manager.set("test_semantic:route", "financial answer")
+        self.cache.add("test_semantic:route", self.embedding, semantic_scope("AAPL", "AAPL", True, False))
+
+        assert self.cache.get(self.embedding, semantic_scope("AAPL", "AAPL", False, True)) is None
+        assert self.cache.get(self.embedding, semantic_scope("AAPL", "AAPL", True, False)) == "financial answer"
+
+    def test_encode_runs_outside_locks(self):
+        """Test that embedding only locks for the model load, not for encode"""
+        cache = self.cache
+
+        class Model:
+            def encode(self, query, normalize_embeddings):
+                assert not cache._lock.locked() and not cache._model_lock.locked()
+                return np.array([1.0, 0.0, 0.0])
+
+        cache.enabled = True
+        cache._model = Model()
+
+        assert cache.embed("NVDA price") is not None
@@ -1,9 +1,9 @@
 """
 Integration tests for SimpleFinancialAgent
 """
+import asyncio
 import pytest
-from unittest.mock import Mock, patch, AsyncMock
-from agents.simple_financial_agent import SimpleFinancialAgent
+from unittest.mock import patch
 
 pytestmark = pytest.mark.integration
 
@@ -11,11 +11,7 @@ pytestmark = pytest.mark.integration
 class TestSimpleFinancialAgent:
     """Test suite for SimpleFinancialAgent"""
     
-    def setup_method(self):
-        """Setup test instance"""
-        self.agent = SimpleFinancialAgent()
-    
-    def test_extract_ticker_company_name(self):
+    def test_extract_ticker_company_name(self, agent):
         """Test ticker extraction from company names"""
         test_cases = [
             ("What is NVIDIA stock price?", "NVDA"),
@@ -26,46 +22,41 @@ class TestSimpleFinancialAgent:
         ]
         
         for query, expected_ticker in test_cases:
-            result = self.agent._extract_ticker(query)
+            result = agent._extract_ticker(query)
             assert result == expected_ticker, f"Failed for query: {query}"
     
-    def test_extract_ticker_explicit(self):
+    def test_extract_ticker_explicit(self, agent):
         """Test ticker extraction with explicit ticker"""
         query = "Get data for AAPL"
-        result = self.agent._extract_ticker(query)
+        result = agent._extract_ticker(query)
         assert result == "AAPL"
     
-    def test_extract_ticker_none(self):
+    def test_extract_ticker_none(self, agent):
         """Test ticker extraction when no ticker found"""
         query = "general market news"
-        result = self.agent._extract_ticker(query)
+        result = agent._extract_ticker(query)
         assert result is None
     
     @pytest.mark.asyncio
-    @patch('tools.financial_tools.FinancialTools.get_stock_data')
-    @patch('tools.financial_tools.FinancialTools.get_analyst_recommendations')
-    @patch('tools.financial_tools.FinancialTools.get_fundamentals')
-    @patch('tools.financial_tools.FinancialTools.get_company_news')
-    async def test_query_success(self, mock_news, mock_fundamentals, mock_analysts, mock_stock):
+    async def test_query_success(self, agent, financial_tools_mock):
         """Test successful query processing"""
         # Setup mocks
-        mock_stock.return_value = {
+        financial_tools_mock['get_stock_data'].return_value = {
             'current_price': 150.0,
             'currency': 'USD',
             'volume': 1000000,
             'market_cap': 2000000000000
         }
-        mock_analysts.return_value = {
+        financial_tools_mock['get_analyst_recommendations'].return_value = {
             'recommendation': 'buy',
             'num_analysts': 30
         }
-        mock_fundamentals.return_value = {
+        financial_tools_mock['get_fundamentals'].return_value = {
             'profit_margins': 0.25
         }
-        mock_news.return_value = []
         
         # Execute
-        result = await self.agent.query("What is Apple stock price?")
+        result = await agent.query("What is Apple stock price?")
         
         # Assert
         assert isinstance(result, str)
@@ -73,35 +64,76 @@ class TestSimpleFinancialAgent:
         assert 'AAPL' in result or 'Stock Data' in result
     
     @pytest.mark.asyncio
-    @patch('tools.financial_tools.FinancialTools.get_stock_data')
-    async def test_compare_stocks_success(self, mock_stock):
-        """Test successful stock comparison"""
-        # Setup mock
-        mock_stock.return_value = {
-            'current_price': 150.0,
-            'currency': 'USD',
-            'market_cap': 2000000000000,
-            'pe_ratio': 25.0
+    @patch('tools.financial_tools.FinancialTools.get_stocks_batch')
+    async def test_compare_stocks_success(self, mock_batch, agent, financial_tools_mock):
+        """Test that a comparison takes prices from one batch quote"""
+        # Setup mocks
+        mock_batch.return_value = {
+            ticker: {
+                'ticker': ticker,
+                'current_price': 150.0,
+                'currency': 'USD',
+                'market_cap': 2000000000000,
+                'pe_ratio': 25.0
+            }
+            for ticker in ("AAPL", "MSFT", "GOOGL")
         }
+        financial_tools_mock['get_fundamentals'].return_value = {'profit_margins': 0.25}
         
         # Execute
-        result = await self.agent.compare_stocks(["AAPL", "MSFT", "GOOGL"])
+        result = await agent.compare_stocks(["aapl", "MSFT", "GOOGL"])
         
         # Assert
-        assert isinstance(result, str)
-        assert 'Comparison' in result or 'AAPL' in result
+        assert 'Comparison' in result
+        assert '| AAPL | $150.00 USD |' in result
+        assert '25.0%' in result
+        mock_batch.assert_called_once_with(["AAPL", "MSFT", "GOOGL"])
+        financial_tools_mock['get_stock_data'].assert_not_called()
+        financial_tools_mock['get_company_news'].assert_not_called()
+        assert financial_tools_mock['get_fundamentals'].call_count == 3
     
     @pytest.mark.asyncio
-    async def test_compare_stocks_too_few(self):
+    async def test_get_ticker_data_cached(self, agent, financial_tools_mock, mock_stock_data):
+        """Test that a ticker bundle is fetched once and then served from cache"""
+        mock_stock = financial_tools_mock['get_stock_data']
+        mock_stock.return_value = mock_stock_data
+        
+        first = await agent.get_ticker_data("zzzz")
+        second = await agent.get_ticker_data("ZZZZ")
+        
+        assert first == second
+        assert first['stock'] == mock_stock_data
+        mock_stock.assert_called_once()
+        assert mock_stock.call_args.args == ("ZZZZ",)
+    
+    @pytest.mark.asyncio
+    async def test_get_ticker_data_single_flight(self, agent, financial_tools_mock, mock_stock_data):
+        """Test that concurrent requests for one ticker share a single fetch"""
+        import time
+        
+        mock_stock = financial_tools_mock['get_stock_data']
+        
+        def slow_stock(ticker, stock=None):
+            time.sleep(0.05)
+            return mock_stock_data
+        mock_stock.side_effect = slow_stock
+        
+        results = await asyncio.gather(*(agent.get_ticker_data("YYYY") for _ in range(5)))
+        
+        assert all(r == results[0] for r in results)
+        assert mock_stock.call_count == 1
+    
+    @pytest.mark.asyncio
+    async def test_compare_stocks_too_few(self, agent):
         """Test comparison with too few tickers"""
-        result = await self.agent.compare_stocks(["AAPL"])
+        result = await agent.compare_stocks(["AAPL"])
         
         assert "at least 2 tickers" in result.lower()
     
     @pytest.mark.asyncio
-    async def test_compare_stocks_too_many(self):
+    async def test_compare_stocks_too_many(self, agent):
         """Test comparison with too many tickers"""
-        result = await self.agent.compare_stocks(
+        result = await agent.compare_stocks(
             ["AAPL", "MSFT", "GOOGL", "AMZN", "META", "TSLA"]
         )
         
@@ -109,7 +141,7 @@ class TestSimpleFinancialAgent:
     
     @pytest.mark.asyncio
     @patch('tools.web_search_tools.WebSearchTools.search_web')
-    async def test_query_no_ticker(self, mock_search):
+    async def test_query_no_ticker(self, mock_search, agent):
         """Test query when no ticker is found (falls back to web search)"""
         # Setup mock
         mock_search.return_value = [
@@ -117,12 +149,12 @@ class TestSimpleFinancialAgent:
         ]
         
         # Execute
-        result = await self.agent.query("general financial news")
+        result = await agent.query("general financial news")
         
         # Assert
         assert isinstance(result, str)
     
-    def test_format_response(self, mock_stock_data, mock_analyst_data):
+    def test_format_response(self, agent, mock_stock_data, mock_analyst_data):
         """Test response formatting"""
         data = {
             'stock': mock_stock_data,
@@ -132,8 +164,35 @@ class TestSimpleFinancialAgent:
         }
         
         # Execute
-        result = self.agent._format_response("AAPL", data)
+        result = agent._format_response("AAPL", data)
         
         # Assert
         assert isinstance(result, str)
         assert len(result) > 0
+
+
+class TestYfCall:
+    """Test suite for the yfinance concurrency limit"""
+    
+    def test_works_across_event_loops(self):
+        """Test that separate event loops each get a usable limit"""
+        from agents.simple_financial_agent import _yf_call
+        
+        assert asyncio.run(_yf_call(lambda: 1)) == 1
+        assert asyncio.run(_yf_call(lambda: 2)) == 2
+    
+    @pytest.mark.asyncio
+    async def test_permit_held_until_thread_finishes(self):
+        """Test that a timed-out call keeps its permit while its thread runs"""
+        import threading
+        from agents.simple_financial_agent import _YF_SEMAPHORES, _yf_call
+        
+        semaphore = asyncio.Semaphore(1)
+        release = threading.Event()
+        with patch.dict(_YF_SEMAPHORES, {asyncio.get_running_loop(): semaphore}):
+            with pytest.raises(asyncio.TimeoutError):
+                await asyncio.wait_for(_yf_call(release.wait, 5), timeout=0.05)
+            assert semaphore.locked()
+            
+            release.set()
+            assert await asyncio.wait_for(_yf_call(lambda: "ok"), timeout=5) == "ok"
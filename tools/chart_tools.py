@@ -16,16 +16,20 @@ Example:
     >>> chart_path = charts.plot_stock_history("NVDA", period="1y")
     >>> # Saves chart to charts/NVDA_1y.png
 """
-import matplotlib
-matplotlib.use('Agg')  # Non-interactive backend for server use
-
-import matplotlib.pyplot as plt
-import matplotlib.dates as mdates
+import functools
+import io
+import numpy as np
 import yfinance as yf
 from datetime import datetime, timedelta
-from typing import List, Optional, Tuple
+from typing import TYPE_CHECKING, Dict, List, Optional, Tuple
 import os
+import threading
 import logging
+from cache.cache_manager import cache_manager
+from config.settings import settings
+
+if TYPE_CHECKING:
+    from matplotlib.figure import Figure
 
 logger = logging.getLogger(__name__)
 
@@ -35,6 +39,79 @@ FIGSIZE = (14, 8)
 DPI = 100
 STYLE = 'seaborn-v0_8-darkgrid'
 
+# Charts are drawn on shared figures, so renders from worker threads take
+# turns; data fetching happens outside the lock
+_PLOT_LOCK = threading.Lock()
+
+@functools.cache
+def _matplotlib():
+    """Import and configure matplotlib on first use.
+    
+    Importing it costs ~0.4s, which processes that never draw a chart
+    (CLI, most tests) should not pay at import time.
+    """
+    import matplotlib
+    matplotlib.use('Agg')  # Non-interactive backend for server use
+    # Long price series: let Agg render paths in chunks instead of one huge path
+    matplotlib.rcParams['agg.path.chunksize'] = 10000
+    return matplotlib
+
+# One Figure per chart layout, cleared and redrawn for every chart instead of
+# building (and closing) a new one each time. Only used under _PLOT_LOCK
+_FIGURES: Dict[str, "Figure"] = {}
+
+def _figure(layout: str) -> "Figure":
+    """Empty reusable figure for a chart layout (caller holds _PLOT_LOCK)"""
+    fig = _FIGURES.get(layout)
+    if fig is None:
+        _matplotlib()
+        from matplotlib.figure import Figure
+        # Constrained layout is solved while drawing, so no tight_layout pass
+        fig = _FIGURES[layout] = Figure(figsize=FIGSIZE, layout='constrained')
+    else:
+        fig.clear()
+    return fig
+
+# Plotted price columns only need single precision; halves the arrays
+# handed to matplotlib for long histories
+_PRICE_DTYPES = {'Open': 'float32', 'High': 'float32', 'Low': 'float32', 'Close': 'float32'}
+
+# Periods whose last bars still move during the trading day
+INTRADAY_PERIODS = frozenset({"1d", "5d"})
+
+
+def _chart_ttl(period: str) -> int:
+    """How long a rendered chart stays valid for a given period"""
+    return settings.CHART_CACHE_TTL if period in INTRADAY_PERIODS else settings.CHART_HISTORY_CACHE_TTL
+
+
+def _moving_average(values: np.ndarray, window: int) -> np.ndarray:
+    """Simple moving average over full windows (len(values) - window + 1 points)"""
+    return np.convolve(values, np.full(window, 1.0 / window), mode='valid')
+
+
+def _bar_verts(x: np.ndarray, heights: np.ndarray, width: float = 0.8) -> np.ndarray:
+    """Corner vertices (n, 4, 2) of bars centred on x, rising from 0 to heights"""
+    verts = np.empty((len(x), 4, 2))
+    verts[:, [0, 1], 0] = (x - width / 2)[:, None]
+    verts[:, [2, 3], 0] = (x + width / 2)[:, None]
+    verts[:, [0, 3], 1] = 0
+    verts[:, [1, 2], 1] = heights[:, None]
+    return verts
+
+
+def warm_up():
+    """Render a throwaway figure so matplotlib, its font cache and the Agg renderer are loaded before the first chart request"""
+    _matplotlib()
+    from matplotlib.figure import Figure
+    
+    with _PLOT_LOCK:
+        fig = Figure(figsize=(1, 1))
+        ax = fig.subplots()
+        ax.plot([0, 1], [0, 1])
+        ax.set_title("warmup")
+        fig.savefig(io.BytesIO(), format='png')
+
 
 class ChartTools:
     """
@@ -64,6 +141,14 @@ class ChartTools:
         os.makedirs(self.chart_dir, exist_ok=True)
         logger.info(f"Chart directory: {os.path.abspath(self.chart_dir)}")
     
+    def _cached_chart(self, cache_key: str) -> Optional[str]:
+        """Path of a previously rendered chart, if it is still on disk"""
+        path = cache_manager.get(cache_key)
+        if path and os.path.exists(path):
+            logger.info(f"Chart cache hit: {path}")
+            return path
+        return None
+    
     def plot_stock_history(
         self, 
         ticker: str, 
@@ -93,6 +178,13 @@ class ChartTools:
             >>> path = charts.plot_stock_history("NVDA", period="1y", show_ma=True)
             >>> # Returns: "charts/NVDA_1y.png"
         """
+        cache_key = cache_manager._generate_key(
+            "chart", [self.chart_dir, ticker.upper(), period, show_ma, show_volume]
+        )
+        cached = self._cached_chart(cache_key)
+        if cached:
+            return cached
+        
         try:
             logger.info(f"Generating chart for {ticker} ({period})")
             
@@ -104,76 +196,86 @@ class ChartTools:
                 raise ValueError(f"No data available for {ticker}")
             
             logger.info(f"Fetched {len(hist)} data points for {ticker}")
+            hist = hist.astype(_PRICE_DTYPES)
             
-            # Create figure with subplots
-            if show_volume:
-                fig, (ax1, ax2) = plt.subplots(2, 1, figsize=FIGSIZE, 
-                                               gridspec_kw={'height_ratios': [3, 1]})
-            else:
-                fig, ax1 = plt.subplots(1, 1, figsize=FIGSIZE)
+            with _PLOT_LOCK:
+                # Create figure with subplots
+                if show_volume:
+                    fig = _figure("history_volume")
+                    ax1, ax2 = fig.subplots(2, 1, gridspec_kw={'height_ratios': [3, 1]})
+                else:
+                    fig = _figure("history")
+                    ax1 = fig.subplots(1, 1)
+                from matplotlib import dates as mdates
+                from matplotlib.artist import setp
+                from matplotlib.collections import PolyCollection
+                from matplotlib.ticker import FuncFormatter
             
-            # Plot price
-            ax1.plot(hist.index, hist['Close'], label='Close Price', 
-                    color='#2E86DE', linewidth=2)
+                # Plot price
+                ax1.plot(hist.index, hist['Close'], label='Close Price', 
+                        color='#2E86DE', linewidth=2)
             
-            # Plot moving averages
-            if show_ma and len(hist) >= 50:
-                ma50 = hist['Close'].rolling(window=50).mean()
-                ax1.plot(hist.index, ma50, label='MA50', 
-                        color='#FF6B6B', linestyle='--', alpha=0.7)
+                # Plot moving averages
+                if show_ma and len(hist) >= 50:
+                    close = hist['Close'].to_numpy(dtype=np.float64)
+                    ax1.plot(hist.index[49:], _moving_average(close, 50), label='MA50', 
+                            color='#FF6B6B', linestyle='--', alpha=0.7)
                 
-                if len(hist) >= 200:
-                    ma200 = hist['Close'].rolling(window=200).mean()
-                    ax1.plot(hist.index, ma200, label='MA200', 
-                            color='#4ECDC4', linestyle='--', alpha=0.7)
+                    if len(hist) >= 200:
+                        ax1.plot(hist.index[199:], _moving_average(close, 200), label='MA200', 
+                                color='#4ECDC4', linestyle='--', alpha=0.7)
             
-            # Formatting
-            ax1.set_title(f'{ticker.upper()} - Price History ({period})', 
-                         fontsize=16, fontweight='bold')
-            ax1.set_ylabel('Price (USD)', fontsize=12)
-            ax1.legend(loc='upper left')
-            ax1.grid(True, alpha=0.3)
+                # Formatting
+                ax1.set_title(f'{ticker.upper()} - Price History ({period})', 
+                             fontsize=16, fontweight='bold')
+                ax1.set_ylabel('Price (USD)', fontsize=12)
+                ax1.legend(loc='upper left')
+                ax1.grid(True, alpha=0.3)
             
-            # Format x-axis dates
-            ax1.xaxis.set_major_formatter(mdates.DateFormatter('%Y-%m-%d'))
-            ax1.xaxis.set_major_locator(mdates.AutoDateLocator())
+                # Format x-axis dates
+                ax1.xaxis.set_major_formatter(mdates.DateFormatter('%Y-%m-%d'))
+                ax1.xaxis.set_major_locator(mdates.AutoDateLocator())
             
-            # Volume subplot
-            if show_volume:
-                # Create color list based on price movement
-                colors = []
-                for idx in range(len(hist)):
-                    if hist['Close'].iloc[idx] >= hist['Open'].iloc[idx]:
-                        colors.append('#26A69A')  # Green for up days
-                    else:
-                        colors.append('#EF5350')  # Red for down days
+                # Volume subplot
+                if show_volume:
+                    # Green for up days, red for down days
+                    up = hist['Close'].to_numpy() >= hist['Open'].to_numpy()
+                    colors = np.where(up, '#26A69A', '#EF5350')
                 
-                ax2.bar(hist.index, hist['Volume'], color=colors, alpha=0.6)
-                ax2.set_ylabel('Volume', fontsize=12)
-                ax2.set_xlabel('Date', fontsize=12)
-                ax2.grid(True, alpha=0.3)
+                    # One PolyCollection instead of a Rectangle patch per bar
+                    x = mdates.date2num(hist.index)
+                    volume = hist['Volume'].to_numpy(dtype=np.float64)
+                    bars = PolyCollection(
+                        _bar_verts(x, volume), facecolors=colors, edgecolors='none', alpha=0.6
+                    )
+                    bars.sticky_edges.y.append(0)
+                    ax2.add_collection(bars)
+                    ax2.xaxis_date()
+                    ax2.autoscale_view()
+                    ax2.set_ylabel('Volume', fontsize=12)
+                    ax2.set_xlabel('Date', fontsize=12)
+                    ax2.grid(True, alpha=0.3)
                 
-                # Format volume numbers (M for millions)
-                ax2.yaxis.set_major_formatter(
-                    plt.FuncFormatter(lambda x, p: f'{x/1e6:.0f}M')
-                )
-            else:
-                ax1.set_xlabel('Date', fontsize=12)
-            
-            # Rotate dates
-            plt.setp(ax1.xaxis.get_majorticklabels(), rotation=45, ha='right')
-            if show_volume:
-                plt.setp(ax2.xaxis.get_majorticklabels(), rotation=45, ha='right')
+                    # Format volume numbers (M for millions)
+                    ax2.yaxis.set_major_formatter(
+                        FuncFormatter(lambda x, p: f'{x/1e6:.0f}M')
+                    )
+                else:
+                    ax1.set_xlabel('Date', fontsize=12)
             
-            # Adjust layout
-            plt.tight_layout()
+                # Rotate dates
+                setp(ax1.xaxis.get_majorticklabels(), rotation=45, ha='right')
+                if show_volume:
+                    setp(ax2.xaxis.get_majorticklabels(), rotation=45, ha='right')
             
-            # Save chart
-            filename = f"{ticker.upper()}_{period}.png"
-            filepath = os.path.join(self.chart_dir, filename)
-            plt.savefig(filepath, dpi=DPI, bbox_inches='tight')
-            plt.close()
+                # Save chart
+                # Non-default options get their own file so cached paths stay valid
+                suffix = ("" if show_ma else "_noma") + ("" if show_volume else "_novol")
+                filename = f"{ticker.upper()}_{period}{suffix}.png"
+                filepath = os.path.join(self.chart_dir, filename)
+                fig.savefig(filepath, dpi=DPI)
             
+            cache_manager.set(cache_key, filepath, ttl=_chart_ttl(period))
             logger.info(f"✅ Chart saved: {filepath}")
             return filepath
             
@@ -209,57 +311,72 @@ class ChartTools:
             ...     normalize=True
             ... )
         """
+        # Same tickers in any order (or case) share one chart
+        tickers = sorted(t.upper() for t in tickers)
+        cache_key = cache_manager._generate_key("chart_compare", [self.chart_dir, tickers, period, normalize])
+        cached = self._cached_chart(cache_key)
+        if cached:
+            return cached
+        
         try:
             logger.info(f"Generating comparison chart for {', '.join(tickers)}")
             
-            fig, ax = plt.subplots(figsize=FIGSIZE)
-            
             colors = ['#2E86DE', '#FF6B6B', '#4ECDC4', '#95E1D3', '#F38181']
+            ylabel = 'Change (%)' if normalize else 'Price (USD)'
+            
+            # Fetch everything before taking the plotting lock, in one batched
+            # download (Close prices: one column per ticker)
+            data = yf.download(tickers, period=period, progress=False, multi_level_index=True)
+            closes = data['Close'].astype('float32') if data is not None and not data.empty else {}
             
+            series = []
             for i, ticker in enumerate(tickers):
-                stock = yf.Ticker(ticker)
-                hist = stock.history(period=period)
+                # Tickers trade on different days; drop the gaps of the shared index
+                prices = closes[ticker].dropna() if ticker in closes else None
                 
-                if hist.empty:
+                if prices is None or prices.empty:
                     logger.warning(f"No data for {ticker}")
                     continue
                 
-                prices = hist['Close']
-                
                 if normalize:
                     # Normalize to percentage change
                     prices = (prices / prices.iloc[0] - 1) * 100
-                    ylabel = 'Change (%)'
-                else:
-                    ylabel = 'Price (USD)'
                 
-                ax.plot(hist.index, prices, label=ticker.upper(), 
-                       color=colors[i % len(colors)], linewidth=2)
-            
-            # Formatting
-            title = f'Stock Comparison - {", ".join([t.upper() for t in tickers])} ({period})'
-            ax.set_title(title, fontsize=16, fontweight='bold')
-            ax.set_xlabel('Date', fontsize=12)
-            ax.set_ylabel(ylabel, fontsize=12)
-            ax.legend(loc='upper left')
-            ax.grid(True, alpha=0.3)
+                series.append((ticker, prices.index, prices, colors[i % len(colors)]))
             
-            # Add zero line if normalized
-            if normalize:
-                ax.axhline(y=0, color='black', linestyle='--', alpha=0.3)
-            
-            # Format dates
-            ax.xaxis.set_major_formatter(mdates.DateFormatter('%Y-%m-%d'))
-            plt.setp(ax.xaxis.get_majorticklabels(), rotation=45, ha='right')
-            
-            plt.tight_layout()
-            
-            # Save
-            filename = f"comparison_{'_'.join(tickers)}_{period}.png"
-            filepath = os.path.join(self.chart_dir, filename)
-            plt.savefig(filepath, dpi=DPI, bbox_inches='tight')
-            plt.close()
+            with _PLOT_LOCK:
+                fig = _figure("comparison")
+                ax = fig.subplots()
+                from matplotlib import dates as mdates
+                from matplotlib.artist import setp
+                
+                for ticker, dates, prices, color in series:
+                    ax.plot(dates, prices, label=ticker.upper(), 
+                           color=color, linewidth=2)
+                
+                # Formatting
+                title = f'Stock Comparison - {", ".join([t.upper() for t in tickers])} ({period})'
+                ax.set_title(title, fontsize=16, fontweight='bold')
+                ax.set_xlabel('Date', fontsize=12)
+                ax.set_ylabel(ylabel, fontsize=12)
+                ax.legend(loc='upper left')
+                ax.grid(True, alpha=0.3)
+                
+                # Add zero line if normalized
+                if normalize:
+                    ax.axhline(y=0, color='black', linestyle='--', alpha=0.3)
+                
+                # Format dates
+                ax.xaxis.set_major_formatter(mdates.DateFormatter('%Y-%m-%d'))
+                setp(ax.xaxis.get_majorticklabels(), rotation=45, ha='right')
+                
+                # Save
+                suffix = "" if normalize else "_raw"
+                filename = f"comparison_{'_'.join(tickers)}_{period}{suffix}.png"
+                filepath = os.path.join(self.chart_dir, filename)
+                fig.savefig(filepath, dpi=DPI)
             
+            cache_manager.set(cache_key, filepath, ttl=_chart_ttl(period))
             logger.info(f"✅ Comparison chart saved: {filepath}")
             return filepath
             
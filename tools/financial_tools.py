@@ -1,4 +1,8 @@
+import functools
+import threading
 import yfinance as yf
+from yfinance.data import YfData
+from dataclasses import dataclass, fields
 from typing import Dict, Any, List, Optional
 from datetime import datetime, timedelta
 import pandas as pd
@@ -8,11 +12,95 @@ import logging
 
 logger = logging.getLogger(__name__)
 
+# yfinance routes every Ticker and YfData request through one process-wide
+# curl_cffi session (YfData is a singleton), so TLS connections and the
+# crumb cookie are already reused across calls. Don't pass a custom
+# session: Yahoo rejects plain requests/httpx clients without browser
+# impersonation.
+
+# Yahoo multi-symbol quote endpoint (one request for many tickers)
+QUOTE_URL = "https://query1.finance.yahoo.com/v7/finance/quote"
+
+# The quote summary (Ticker.info) feeds get_stock_data, get_analyst_recommendations
+# and get_fundamentals. It is cached per symbol for STOCK_CACHE_TTL (the shortest
+# of their TTLs), and misses are serialized per symbol so concurrent callers
+# download it once. Ticker objects themselves aren't reused: they keep their
+# first info/history forever.
+# Striped locks: a fixed pool shared by hash, so arbitrary user symbols
+# can't grow it (two symbols sharing a stripe just take turns)
+_INFO_LOCKS = tuple(threading.Lock() for _ in range(64))
+
+def _ticker_info(stock: yf.Ticker) -> Dict[str, Any]:
+    """Quote summary for stock's symbol, from the cache when possible"""
+    cache_key = cache_manager._generate_key("ticker_info", stock.ticker)
+    info = cache_manager.get(cache_key)
+    if info is None:
+        with _INFO_LOCKS[hash(stock.ticker) % len(_INFO_LOCKS)]:
+            info = cache_manager.get(cache_key)
+            if info is None:
+                info = stock.info
+                if info:
+                    cache_manager.set(cache_key, info, ttl=settings.STOCK_CACHE_TTL)
+    return info
+
+@functools.cache
+def _field_names(cls) -> tuple:
+    """Field names of a record class, computed once per class"""
+    return tuple(f.name for f in fields(cls))
+
+class _Record:
+    """Typed view over a FinancialTools result dict"""
+    __slots__ = ()
+    
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]):
+        """Build the record from a result dict, ignoring unknown keys"""
+        return cls(**{name: data[name] for name in _field_names(cls) if name in data})
+
+@dataclass(slots=True)
+class StockData(_Record):
+    ticker: str
+    current_price: Optional[float] = None
+    open: Optional[float] = None
+    high: Optional[float] = None
+    low: Optional[float] = None
+    close: Optional[float] = None
+    volume: Optional[int] = None
+    currency: str = ""
+    market_cap: Optional[int] = None
+    pe_ratio: Optional[float] = None
+    dividend_yield: Optional[float] = None
+
+@dataclass(slots=True)
+class AnalystRecommendations(_Record):
+    ticker: str
+    recommendation: Optional[str] = None
+    mean_recommendation: Optional[float] = None
+    num_analysts: Optional[int] = None
+    target_mean: Optional[float] = None
+    target_high: Optional[float] = None
+    target_low: Optional[float] = None
+
+@dataclass(slots=True)
+class Fundamentals(_Record):
+    ticker: str
+    market_cap: Optional[int] = None
+    pe_ratio: Optional[float] = None
+    forward_pe: Optional[float] = None
+    peg_ratio: Optional[float] = None
+    price_to_book: Optional[float] = None
+    debt_to_equity: Optional[float] = None
+    return_on_equity: Optional[float] = None
+    profit_margins: Optional[float] = None
+    operating_margins: Optional[float] = None
+    revenue_growth: Optional[float] = None
+    earnings_growth: Optional[float] = None
+
 class FinancialTools:
     """Clean financial data tools with caching"""
     
     @staticmethod
-    def get_stock_data(ticker: str) -> Dict[str, Any]:
+    def get_stock_data(ticker: str, stock: Optional[yf.Ticker] = None) -> Dict[str, Any]:
         """Get comprehensive stock data"""
         cache_key = cache_manager._generate_key("stock_data", ticker)
         
@@ -22,14 +110,19 @@ class FinancialTools:
             return cached
         
         try:
-            stock = yf.Ticker(ticker)
-            info = stock.info
-            hist = stock.history(period="1mo")
+            stock = stock or yf.Ticker(ticker)
+            # History first: a concurrent analysts/fundamentals call sharing
+            # this Ticker can fetch info in the meantime
+            # Only the last bar is read; 5 days still covers long weekends
+            hist = stock.history(period="5d", interval="1d")
             
             if hist.empty:
                 raise ValueError(f"No data found for {ticker}")
             
-            latest = hist.iloc[-1]
+            info = _ticker_info(stock)
+            
+            # Plain dict of the last bar: one conversion instead of a label lookup per field
+            latest = hist.iloc[-1].to_dict()
             
             data = {
                 "ticker": ticker,
@@ -49,7 +142,7 @@ class FinancialTools:
             }
             
             # Cache the result
-            cache_manager.set(cache_key, data, ttl=300)  # 5 minutes
+            cache_manager.set(cache_key, data, ttl=settings.STOCK_CACHE_TTL)
             return data
             
         except Exception as e:
@@ -57,7 +150,7 @@ class FinancialTools:
             return {"error": str(e), "ticker": ticker}
     
     @staticmethod
-    def get_analyst_recommendations(ticker: str) -> Dict[str, Any]:
+    def get_analyst_recommendations(ticker: str, stock: Optional[yf.Ticker] = None) -> Dict[str, Any]:
         """Get analyst recommendations"""
         cache_key = cache_manager._generate_key("analyst_recs", ticker)
         
@@ -66,8 +159,8 @@ class FinancialTools:
             return cached
         
         try:
-            stock = yf.Ticker(ticker)
-            info = stock.info
+            stock = stock or yf.Ticker(ticker)
+            info = _ticker_info(stock)
             
             data = {
                 "ticker": ticker,
@@ -80,7 +173,7 @@ class FinancialTools:
                 "timestamp": datetime.now().isoformat()
             }
             
-            cache_manager.set(cache_key, data, ttl=3600)  # 1 hour
+            cache_manager.set(cache_key, data, ttl=settings.ANALYST_CACHE_TTL)
             return data
             
         except Exception as e:
@@ -88,7 +181,7 @@ class FinancialTools:
             return {"error": str(e), "ticker": ticker}
     
     @staticmethod
-    def get_company_news(ticker: str, limit: int = 5) -> List[Dict[str, Any]]:
+    def get_company_news(ticker: str, limit: int = 5, stock: Optional[yf.Ticker] = None) -> List[Dict[str, Any]]:
         """Get latest company news"""
         cache_key = cache_manager._generate_key("company_news", f"{ticker}_{limit}")
         
@@ -97,8 +190,9 @@ class FinancialTools:
             return cached
         
         try:
-            stock = yf.Ticker(ticker)
-            news_items = stock.news[:limit] if stock.news else []
+            stock = stock or yf.Ticker(ticker)
+            news = stock.news
+            news_items = news[:limit] if news else []
             
             formatted_news = []
             for item in news_items:
@@ -110,7 +204,7 @@ class FinancialTools:
                     "related_tickers": item.get("relatedTickers", [])
                 })
             
-            cache_manager.set(cache_key, formatted_news, ttl=300)  # 5 minutes
+            cache_manager.set(cache_key, formatted_news, ttl=settings.NEWS_CACHE_TTL)
             return formatted_news
             
         except Exception as e:
@@ -118,7 +212,7 @@ class FinancialTools:
             return [{"error": str(e)}]
     
     @staticmethod
-    def get_fundamentals(ticker: str) -> Dict[str, Any]:
+    def get_fundamentals(ticker: str, stock: Optional[yf.Ticker] = None) -> Dict[str, Any]:
         """Get company fundamentals"""
         cache_key = cache_manager._generate_key("fundamentals", ticker)
         
@@ -127,8 +221,8 @@ class FinancialTools:
             return cached
         
         try:
-            stock = yf.Ticker(ticker)
-            info = stock.info
+            stock = stock or yf.Ticker(ticker)
+            info = _ticker_info(stock)
             
             data = {
                 "ticker": ticker,
@@ -146,9 +240,77 @@ class FinancialTools:
                 "timestamp": datetime.now().isoformat()
             }
             
-            cache_manager.set(cache_key, data, ttl=3600)  # 1 hour
+            cache_manager.set(cache_key, data, ttl=settings.FUNDAMENTALS_CACHE_TTL)
             return data
             
         except Exception as e:
             logger.error(f"Fundamentals error: {e}")
-            return {"error": str(e), "ticker": ticker}
\ No newline at end of file
+            return {"error": str(e), "ticker": ticker}
+    
+    @staticmethod
+    def get_stocks_batch(tickers: List[str]) -> Dict[str, Dict[str, Any]]:
+        """Get stock data for several tickers with a single quote request.
+        
+        Returns the same shape as get_stock_data per ticker. The values come
+        from Yahoo's quote endpoint, not the daily history and quote summary
+        get_stock_data reads, so they are cached under their own key: a later
+        get_stock_data call never returns them.
+        """
+        results = {}
+        missing = []
+        for ticker in tickers:
+            cached = cache_manager.get(cache_manager._generate_key("stock_quote", ticker))
+            if cached:
+                results[ticker] = cached
+            else:
+                missing.append(ticker)
+        
+        if not missing:
+            return results
+        
+        try:
+            response = YfData().get_raw_json(
+                QUOTE_URL,
+                params={"symbols": ",".join(missing), "formatted": "false"}
+            )
+            quotes = {
+                quote.get("symbol", "").upper(): quote
+                for quote in response.get("quoteResponse", {}).get("result") or []
+            }
+            timestamp = datetime.now().isoformat()
+            
+            for ticker in missing:
+                quote = quotes.get(ticker.upper())
+                if not quote or quote.get("regularMarketPrice") is None:
+                    results[ticker] = {"error": f"No data found for {ticker}", "ticker": ticker}
+                    continue
+                
+                data = {
+                    "ticker": ticker,
+                    "current_price": quote.get("regularMarketPrice"),
+                    "open": quote.get("regularMarketOpen"),
+                    "high": quote.get("regularMarketDayHigh"),
+                    "low": quote.get("regularMarketDayLow"),
+                    "close": quote.get("regularMarketPrice"),
+                    "volume": quote.get("regularMarketVolume"),
+                    "currency": quote.get("currency", "USD"),
+                    "market_cap": quote.get("marketCap"),
+                    "pe_ratio": quote.get("trailingPE"),
+                    "dividend_yield": quote.get("dividendYield"),
+                    "52_week_high": quote.get("fiftyTwoWeekHigh"),
+                    "52_week_low": quote.get("fiftyTwoWeekLow"),
+                    "timestamp": timestamp
+                }
+                cache_manager.set(
+                    cache_manager._generate_key("stock_quote", ticker),
+                    data,
+                    ttl=settings.STOCK_CACHE_TTL
+                )
+                results[ticker] = data
+            
+        except Exception as e:
+            logger.error(f"Batch stock data error for {', '.join(missing)}: {e}")
+            for ticker in missing:
+                results[ticker] = {"error": str(e), "ticker": ticker}
+        
+        return results
@@ -1,3 +1,4 @@
+import asyncio
 from ddgs import DDGS
 from typing import List, Dict, Any, Optional
 from datetime import datetime, timedelta
@@ -11,6 +12,8 @@ class WebSearchTools:
     """Web search tools using DuckDuckGo"""
     
     def __init__(self):
+        # One DDGS instance caches its search engines and their HTTP
+        # clients, so keep-alive connections are pooled across searches
         self.ddgs = DDGS()
         self.max_results = 5
     
@@ -88,15 +91,13 @@ class WebSearchTools:
     
     def _extract_source(self, url: str) -> str:
         """Extract source domain from URL"""
-        try:
-            from urllib.parse import urlparse
-            domain = urlparse(url).netloc
-            # Remove www. prefix
-            if domain.startswith("www."):
-                domain = domain[4:]
-            return domain
-        except:
+        # Plain string split: the host is all we need, no full URL parse
+        _, sep, rest = url.partition("://")
+        if not sep:
             return "Unknown"
+        domain = rest.split("/", 1)[0].split("?", 1)[0].split("#", 1)[0]
+        # Remove www. prefix
+        return domain.removeprefix("www.") or "Unknown"
     
     def search_financial_news(self, company: str) -> List[Dict[str, Any]]:
         """Search for financial news about a specific company"""
@@ -108,5 +109,23 @@ class WebSearchTools:
         query = f"{topic} market analysis outlook forecast"
         return self.search_web(query)
 
+    # Async variants run the blocking DDGS calls in a worker thread so
+    # several searches can be awaited concurrently
+    async def asearch_web(self, query: str, region: str = "wt-wt") -> List[Dict[str, Any]]:
+        """Async variant of search_web"""
+        return await asyncio.to_thread(self.search_web, query, region)
+
+    async def asearch_news(self, query: str, region: str = "wt-wt") -> List[Dict[str, Any]]:
+        """Async variant of search_news"""
+        return await asyncio.to_thread(self.search_news, query, region)
+
+    async def asearch_financial_news(self, company: str) -> List[Dict[str, Any]]:
+        """Async variant of search_financial_news"""
+        return await asyncio.to_thread(self.search_financial_news, company)
+
+    async def asearch_market_analysis(self, topic: str) -> List[Dict[str, Any]]:
+        """Async variant of search_market_analysis"""
+        return await asyncio.to_thread(self.search_market_analysis, topic)
+
 # Create a global instance
 web_search_tools = WebSearchTools()
\ No newline at end of file